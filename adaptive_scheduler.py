@@ -0,0 +1,91 @@
+import threading
+import logging
+from datetime import datetime, timedelta, time as dtime
+
+def parse_time(value):
+    """"HH:MM" 문자열, 시(int) 또는 datetime.time을 datetime.time으로 변환"""
+    if isinstance(value, dtime):
+        return value
+    if isinstance(value, int):
+        return dtime(hour=value % 24)
+    return datetime.strptime(value, "%H:%M").time()
+
+class TimeWindow:
+    """하루 중 특정 구간과 그 구간에서 사용할 실행 주기 (자정을 넘는 구간 허용)"""
+
+    def __init__(self, start, end, interval):
+        self.start = parse_time(start)
+        self.end = parse_time(end)
+        self.interval = interval  # 초
+
+    def contains(self, now):
+        t = now.time()
+        if self.start <= self.end:
+            return self.start <= t < self.end
+        return t >= self.start or t < self.end
+
+    def next_start(self, now):
+        """now 이후 가장 가까운 구간 시작 시각"""
+        start = datetime.combine(now.date(), self.start)
+        if start <= now:
+            start += timedelta(days=1)
+        return start
+
+    def __repr__(self):
+        return f"TimeWindow({self.start:%H:%M}-{self.end:%H:%M}, {self.interval}s)"
+
+class AdaptiveScheduler:
+    """시간 구간별로 주기를 바꾸고, 다음 실행 시각까지 정확히 대기하는 스케줄러"""
+
+    def __init__(self, default_interval=300, windows=None):
+        self.default_interval = default_interval
+        self.windows = list(windows or [])
+        self._stop = threading.Event()
+
+    def add_window(self, start, end, interval):
+        self.windows.append(TimeWindow(start, end, interval))
+
+    def interval_at(self, now):
+        """now 시점에 적용되는 실행 주기 (겹치면 가장 짧은 주기)"""
+        intervals = [w.interval for w in self.windows if w.contains(now)]
+        return min(intervals, default=self.default_interval)
+
+    def next_run(self, last_run):
+        """마지막 실행 시각 기준 다음 실행 시각
+
+        현재 주기보다 짧은 주기의 구간이 그 전에 시작되면 구간 시작 시각에 실행합니다.
+        """
+        interval = self.interval_at(last_run)
+        next_time = last_run + timedelta(seconds=interval)
+        for window in self.windows:
+            if window.interval < interval:
+                start = window.next_start(last_run)
+                if start < next_time:
+                    next_time = start
+        return next_time
+
+    def stop(self):
+        """대기 중인 run 루프를 즉시 깨워서 종료"""
+        self._stop.set()
+
+    def run(self, job, run_immediately=True, stop_on_success=False):
+        """job을 반복 실행 (stop_on_success면 job이 True를 반환할 때 종료)"""
+        self._stop.clear()
+        next_time = datetime.now()
+        if not run_immediately:
+            next_time = self.next_run(next_time)
+
+        while not self._stop.is_set():
+            delay = (next_time - datetime.now()).total_seconds()
+            if delay > 0 and self._stop.wait(delay):
+                break
+
+            started = datetime.now()
+            result = job()
+            if stop_on_success and result:
+                break
+
+            # 작업이 다음 실행 시각을 넘기면 바로 다시 실행
+            next_time = self.next_run(started)
+            logging.debug(f"다음 확인 시각: {next_time:%H:%M:%S} "
+                          f"(주기 {self.interval_at(next_time)}초)")
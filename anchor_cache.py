@@ -0,0 +1,97 @@
+import os
+import json
+import logging
+import cv2
+import numpy as np
+
+class AnchorCache:
+    """자주 누르는 버튼의 위치와 모양을 기억해 두고 OCR 없이 다시 찾는 캐시
+
+    위치는 기준 영역(앱 영역) 왼쪽 위를 원점으로 저장하며,
+    기준 영역 크기가 달라지면 저장된 위치는 사용하지 않습니다.
+    remember()는 메모리만 바꾸고, 파일에는 flush()를 호출할 때(확인 주기마다, 종료 시) 씁니다.
+    """
+
+    def __init__(self, path=None, margin=10, threshold=0.9):
+        self.path = path
+        self.margin = margin        # 기억한 위치 주변 탐색 여유 (픽셀)
+        self.threshold = threshold  # 같은 버튼으로 볼 최소 매칭 정확도
+        self.anchors = {}           # text -> (기준 영역 크기, (x, y, w, h), 이미지 조각)
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False          # 마지막 저장 이후 바뀐 내용이 있는지
+        if path:
+            self.load()
+
+    def remember(self, text, base_region, box, crop):
+        """OCR로 찾은 버튼 위치(기준 영역 좌표)와 이미지 조각 저장"""
+        self.anchors[text] = (self._size(base_region), tuple(int(v) for v in box),
+                              np.ascontiguousarray(crop))
+        self.dirty = True
+
+    def forget(self, text):
+        if self.anchors.pop(text, None) is not None:
+            self.dirty = True
+
+    def flush(self):
+        """바뀐 내용이 있으면 파일에 저장"""
+        if self.path and self.dirty:
+            self.save()
+
+    def lookup(self, capture, text, base_region):
+        """기억한 위치 주변을 캡처하여 조각과 비교 - 맞으면 화면 절대 좌표(중심) 반환"""
+        anchor = self.anchors.get(text)
+        if anchor is None:
+            return None
+        size, (x, y, w, h), crop = anchor
+        if size != self._size(base_region):
+            return None
+
+        left = base_region[0] + max(0, x - self.margin)
+        top = base_region[1] + max(0, y - self.margin)
+        right = min(base_region[2], base_region[0] + x + w + self.margin)
+        bottom = min(base_region[3], base_region[1] + y + h + self.margin)
+        window = capture.grab((left, top, right, bottom), gray=True)
+        if window is None or window.shape[0] < h or window.shape[1] < w:
+            self.misses += 1
+            return None
+
+        result = cv2.matchTemplate(window, crop, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if not np.isfinite(max_val) or max_val < self.threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return (left + max_loc[0] + w // 2, top + max_loc[1] + h // 2)
+
+    def _size(self, region):
+        return (region[2] - region[0], region[3] - region[1])
+
+    def save(self):
+        try:
+            meta = {}
+            arrays = {}
+            for i, (text, (size, box, crop)) in enumerate(self.anchors.items()):
+                meta[text] = {'size': size, 'box': box, 'key': f"crop_{i}"}
+                arrays[f"crop_{i}"] = crop
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except Exception as e:
+            logging.error(f"버튼 위치 캐시 저장 실패: {str(e)}")
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                meta = json.loads(str(data['meta']))
+                for text, item in meta.items():
+                    self.anchors[text] = (tuple(item['size']), tuple(item['box']),
+                                          data[item['key']])
+            logging.info(f"버튼 위치 캐시 로드: {', '.join(self.anchors)}")
+        except Exception as e:
+            logging.error(f"버튼 위치 캐시 로드 실패: {str(e)}")
+            self.anchors = {}
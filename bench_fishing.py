@@ -0,0 +1,209 @@
+"""녹화된 프레임 시퀀스로 FishingBot의 입질 감지 성능을 측정하는 벤치마크
+
+시퀀스 폴더 구성:
+    frame_0000.png, frame_0001.png, ...   감시 영역을 녹화한 프레임 (이름순 재생)
+    sequence.json                         {"fps": 20, "bites": [[3.2, 4.7], ...]}
+
+bites는 느낌표가 화면에 보이는 구간 [시작, 끝] (초)입니다.
+fps 대신 프레임별 시각 목록 "timestamps"를 줄 수 있습니다.
+
+run_fishing_macro 상태 머신을 그대로 실행하되 키보드는 기록용 가짜 키보드로,
+time.sleep은 가상 시계로 대체합니다. 가상 시각 = 실제 경과 시간 + sleep한 시간이므로
+매칭 비용은 지연 시간에 그대로 반영됩니다.
+
+사용법 (저장소 루트에서):
+    python bench_fishing.py recordings/seq1 recordings/seq2 --threshold 0.5 --poll 0.1
+"""
+import os
+import json
+import glob
+import time
+import random
+import bisect
+import argparse
+import contextlib
+import cv2
+import numpy as np
+from headless import load_fishing_module
+from input_backend import RecordingInput
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+METHODS = {
+    'ccoeff': cv2.TM_CCOEFF_NORMED,
+    'ccorr': cv2.TM_CCORR_NORMED,
+}
+
+class ReplayClock:
+    """sleep은 즉시 반환하고 그만큼 가상 시각을 앞당기는 시계"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.offset = 0.0
+
+    def time(self):
+        return time.perf_counter() - self.start + self.offset
+
+    def sleep(self, seconds):
+        self.offset += max(0.0, seconds)
+
+class FakeKeyboard(RecordingInput):
+    """키 입력을 가상 시각과 함께 기록"""
+
+    def __init__(self, clock):
+        super().__init__(clock=clock.time)
+        self.keys = []          # (시각, 키, 입질 대응 여부)
+        self.reel_pending = False
+
+    def press(self, key):
+        super().press(key)
+        self.keys.append((self.clock(), key, self.reel_pending))
+        self.reel_pending = False
+
+class Sequence:
+    """녹화 프레임과 정답 입질 구간"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'sequence.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        files = sorted(f for f in glob.glob(os.path.join(path, '*'))
+                       if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')))
+        # 디스크 읽기 비용이 지연 시간에 섞이지 않도록 미리 로드
+        self.frames = [cv2.imread(f, cv2.IMREAD_GRAYSCALE) for f in files]
+        if 'timestamps' in meta:
+            self.timestamps = list(meta['timestamps'])
+        else:
+            fps = meta.get('fps', 10)
+            self.timestamps = [i / fps for i in range(len(self.frames))]
+        self.bites = [tuple(b) for b in meta.get('bites', [])]
+        self.duration = self.timestamps[-1] if self.timestamps else 0.0
+
+    def frame_at(self, t):
+        """가상 시각 t에 화면에 보이던 프레임 (재생이 끝나면 None)"""
+        if t > self.duration:
+            return None
+        index = bisect.bisect_right(self.timestamps, t) - 1
+        return self.frames[max(0, index)]
+
+def percentile(values, q):
+    if not values:
+        return float('nan')
+    return float(np.percentile(values, q))
+
+def evaluate(bites, events):
+    """입질 구간과 릴 감기 입력을 비교하여 지연/오탐/미탐 계산"""
+    reel_times = [t for t, key, reel in events if reel]
+    hit = [False] * len(bites)
+    latencies = []
+    false_positives = 0
+    for t in reel_times:
+        for i, (start, end) in enumerate(bites):
+            if not hit[i] and start <= t <= end:
+                hit[i] = True
+                latencies.append(t - start)
+                break
+        else:
+            false_positives += 1
+    return latencies, false_positives, hit.count(False)
+
+def run_sequence(module, sequence, args):
+    clock = ReplayClock()
+    keyboard = FakeKeyboard(clock)
+    module.time = clock
+    module.capture_screen_region = lambda region: sequence.frame_at(clock.time())
+    random.seed(args.seed)
+
+    bot = module.FishingBot(ui=False)
+    bot.input = keyboard
+    bot.bite_threshold = args.threshold
+    bot.poll_interval = args.poll
+    bot.matcher = module.create_matcher(args.engine, bot.templates, scales=args.scales,
+                                        methods=[METHODS[m] for m in args.methods])
+    if args.no_gate:
+        for state in bot.regions:
+            state.change_detector.max_skip = 0
+
+    frame_costs = []
+    find_template_matches = bot.find_template_matches
+
+    def timed_match(screens, threshold=None, buffers=None):
+        start = time.perf_counter()
+        matches = find_template_matches(screens, threshold, buffers)
+        frame_costs.append(time.perf_counter() - start)
+        keyboard.reel_pending = any(matched for matched, _ in matches)
+        return matches
+
+    bot.find_template_matches = timed_match
+    bot.use_pipeline = False  # 가상 시계와 함께 쓰려면 캡처/매칭을 한 스레드에서 순서대로
+    bot.is_running = True
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        bot.run_fishing_macro()
+
+    latencies, false_positives, misses = evaluate(sequence.bites, keyboard.keys)
+    return {
+        'sequence': sequence.path,
+        'frames_matched': len(frame_costs),
+        'skip_ratio': bot.regions[0].change_detector.skip_ratio,
+        'frame_cost_ms': {
+            'mean': float(np.mean(frame_costs)) * 1000 if frame_costs else float('nan'),
+            'p50': percentile(frame_costs, 50) * 1000,
+            'p99': percentile(frame_costs, 99) * 1000,
+        },
+        'bites': len(sequence.bites),
+        'latency_ms': {
+            'p50': percentile(latencies, 50) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+        },
+        'latencies': latencies,
+        'false_positives': false_positives,
+        'misses': misses,
+    }
+
+def print_report(result):
+    cost = result['frame_cost_ms']
+    latency = result['latency_ms']
+    print(f"[{result['sequence']}]")
+    print(f"  매칭 프레임 {result['frames_matched']}개, 생략 비율 {result['skip_ratio']:.1%}")
+    print(f"  프레임당 비용: 평균 {cost['mean']:.2f}ms, p50 {cost['p50']:.2f}ms, p99 {cost['p99']:.2f}ms")
+    print(f"  입질->키입력 지연: p50 {latency['p50']:.0f}ms, p99 {latency['p99']:.0f}ms")
+    print(f"  입질 {result['bites']}회, 미탐 {result['misses']}회, 오탐 {result['false_positives']}회")
+
+def main():
+    parser = argparse.ArgumentParser(description="FishingBot 입질 감지 벤치마크")
+    parser.add_argument('sequences', nargs='+', help="녹화 시퀀스 폴더")
+    parser.add_argument('--threshold', type=float, default=0.5, help="입질 판정 임계값")
+    parser.add_argument('--poll', type=float, default=0.1, help="캡처 주기 (초)")
+    parser.add_argument('--engine', default='fft', choices=['fft', 'pyramid'], help="매칭 엔진")
+    parser.add_argument('--methods', nargs='+', default=['ccoeff', 'ccorr'], choices=sorted(METHODS))
+    parser.add_argument('--scales', nargs='+', type=float, default=[0.8, 0.9, 1.0, 1.1, 1.2])
+    parser.add_argument('--no-gate', action='store_true', help="화면 변화 감지 없이 매 프레임 매칭")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    sequences = [Sequence(os.path.abspath(path)) for path in args.sequences]
+    # 템플릿 파일은 저장소 루트 기준 상대 경로
+    os.chdir(BASE_DIR)
+    module = load_fishing_module()
+
+    results = []
+    for sequence in sequences:
+        result = run_sequence(module, sequence, args)
+        print_report(result)
+        results.append(result)
+
+    all_latencies = [l for r in results for l in r['latencies']]
+    print(f"전체: 입질 {sum(r['bites'] for r in results)}회, "
+          f"지연 p50 {percentile(all_latencies, 50) * 1000:.0f}ms / "
+          f"p99 {percentile(all_latencies, 99) * 1000:.0f}ms, "
+          f"미탐 {sum(r['misses'] for r in results)}회, "
+          f"오탐 {sum(r['false_positives'] for r in results)}회")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
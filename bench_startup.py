@@ -0,0 +1,134 @@
+"""스크립트 시작 시간 벤치마크 (import 시간, 첫 캡처까지의 시간)
+
+매 측정마다 새 파이썬 프로세스를 띄워서 측정합니다.
+    wall           프로세스 시작부터 종료까지 (인터프리터 시작 포함)
+    import         대상 모듈 import에 걸린 시간
+    first_capture  import 시작부터 봇 생성 후 첫 화면 캡처까지
+
+사용법 (저장소 루트에서):
+    python bench_startup.py --repeat 5 --top 10
+    python bench_startup.py fishing --replay recordings/seq1   # 화면 없이 재생 소스로 캡처
+"""
+import time
+_START = time.perf_counter()
+
+import os
+import sys
+import json
+import importlib
+import argparse
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TARGETS = ('golf', 'schedules', 'fishing')
+
+def child(target, capture):
+    """자식 프로세스: 대상 모듈을 import하고 (선택) 첫 캡처까지 측정하여 JSON 출력"""
+    import headless
+    started = time.perf_counter()
+    module = None
+    if target == 'fishing':
+        module = headless.load_fishing_module()
+    elif target == 'golf':
+        importlib.import_module('golf_reservation')
+    elif target == 'schedules':
+        importlib.import_module('schedules')
+    result = {'import': time.perf_counter() - started}
+
+    if capture:
+        try:
+            bot, _ = headless.create_bot(target, {})
+            if module is not None:
+                frame = module.capture_screen_region(bot.regions[0].region)
+            else:
+                frame = bot.capture.grab(None, gray=True)
+            if frame is None:
+                raise RuntimeError("캡처 결과가 없습니다")
+            result['first_capture'] = time.perf_counter() - started
+        except Exception as e:
+            result['capture_error'] = str(e)
+    result['since_start'] = time.perf_counter() - _START
+    print(json.dumps(result))
+
+def measure(target, capture, env):
+    command = [sys.executable, os.path.abspath(__file__), '--child', target]
+    if not capture:
+        command.append('--no-capture')
+    started = time.perf_counter()
+    output = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if output.returncode != 0:
+        raise RuntimeError(output.stderr.strip().splitlines()[-1] if output.stderr else "실패")
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result['wall'] = wall
+    return result
+
+def heaviest_imports(target, env, count):
+    """python -X importtime 결과에서 자체 import 시간이 긴 모듈"""
+    command = [sys.executable, '-X', 'importtime', os.path.abspath(__file__),
+               '--child', target, '--no-capture']
+    output = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    rows = []
+    for line in output.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description="스크립트 시작 시간 벤치마크")
+    parser.add_argument('targets', nargs='*', default=list(TARGETS), help="golf, schedules, fishing")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-capture', action='store_true', help="첫 캡처 시간은 측정하지 않음")
+    parser.add_argument('--replay', help="캡처 대신 재생할 이미지 폴더/동영상 (CAPTURE_REPLAY)")
+    parser.add_argument('--top', type=int, default=0, help="자체 import 시간이 긴 모듈 N개 출력")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, not args.no_capture)
+        return
+
+    env = dict(os.environ)
+    if args.replay:
+        env['CAPTURE_BACKEND'] = 'replay'
+        env['CAPTURE_REPLAY'] = os.path.abspath(args.replay)
+
+    report = {}
+    for target in args.targets:
+        if target not in TARGETS:
+            parser.error(f"알 수 없는 대상: {target}")
+        try:
+            runs = [measure(target, not args.no_capture, env) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"[{target}] 측정 실패: {e}")
+            continue
+
+        summary = {}
+        for key in ('wall', 'import', 'first_capture'):
+            values = [run[key] for run in runs if key in run]
+            if values:
+                summary[key] = statistics.median(values) * 1000
+        errors = sorted({run['capture_error'] for run in runs if 'capture_error' in run})
+        report[target] = {'median_ms': summary, 'capture_errors': errors}
+
+        print(f"[{target}] " + ", ".join(f"{key} {value:.0f}ms" for key, value in summary.items()))
+        for error in errors:
+            print(f"  첫 캡처 실패: {error}")
+        if args.top:
+            report[target]['heaviest_imports'] = []
+            for self_us, cumulative_us, name in heaviest_imports(target, env, args.top):
+                print(f"  {self_us / 1000:7.1f}ms (누적 {cumulative_us / 1000:7.1f}ms)  {name}")
+                report[target]['heaviest_imports'].append(
+                    {'module': name, 'self_ms': self_us / 1000, 'cumulative_ms': cumulative_us / 1000})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,31 @@
-import pyautogui
+import sys
+import json
 import cv2
 import numpy as np
 import time
+from time import perf_counter
 import random
-import tkinter as tk
 from threading import Thread
 import threading
-import keyboard
-from PIL import ImageGrab, Image, ImageTk
+from concurrent.futures import ThreadPoolExecutor
+from template_bank import TemplateBank, preprocess
+from frame_change import FrameChangeDetector
+from template_matching import create_matcher
+from screen_capture import create_backend
+from frame_ring import FrameRing, CaptureThread
+from metrics import StageMetrics, Profiler
+from input_backend import create_input
+from lazy_import import lazy_import
+
+# UI 라이브러리는 처음 사용할 때 import (헤드리스 실행 시 tkinter를 불러오지 않음)
+tk = lazy_import('tkinter')
+
+capture = create_backend()  # 화면 캡처 백엔드 (mss / PIL / replay)
 
 def capture_screen_region(region):
-    """지정된 영역의 스크린샷을 캡처합니다"""
-    screenshot = pyautogui.screenshot(region=region)
-    return cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+    """지정된 영역(x, y, w, h)을 그레이스케일로 캡처합니다"""
+    x, y, w, h = region
+    return capture.grab((x, y, x + w, y + h), gray=True)
 
 def find_template_match(screen_img, template_img, threshold=None):
     """이미지 매칭을 수행하고 매칭 위치와 정확도를 반환합니다"""
@@ -58,54 +71,103 @@ def random_delay():
     """1초에서 2초 사이의 랜덤한 시간을 반환합니다"""
     return random.uniform(1.0, 2.0)
 
+class FishingRegion:
+    """감시 영역 하나의 낚시 상태 (영역마다 독립적으로 진행)
+
+    idle(찌 던지기 전) -> fishing(입질 감시) -> reeling(릴 감기 전 대기) -> idle
+    """
+
+    def __init__(self, index, region, focus_point=None, focus_center=False):
+        self.index = index
+        self.region = region            # (x, y, w, h)
+        self.focus_point = focus_point  # 키 입력 전 클릭하여 게임 창을 활성화할 화면 좌표
+        self.focus_center = focus_center  # focus_point가 없으면 현재 영역 중심을 클릭
+        self.state = 'idle'
+        self.resume_at = 0.0            # 이 시각까지 다음 동작 대기
+        self.last_fish_time = 0.0
+        self.confidence = 0.0
+        self.buffer = None              # 매칭 전처리 결과를 기록할 재사용 버퍼
+        self.change_detector = FrameChangeDetector()  # 화면 변화가 있을 때만 매칭
+
+    def focus_target(self):
+        """키 입력 전에 클릭할 화면 좌표 (클릭하지 않으면 None)"""
+        if self.focus_point is not None:
+            return self.focus_point
+        if self.focus_center:
+            x, y, w, h = self.region
+            return (x + w // 2, y + h // 2)
+        return None
+
+def parse_region(spec):
+    """영역 설정 하나를 ((x, y, w, h), focus_point)로 변환
+
+    [x, y, w, h] 또는 {"region": [x, y, w, h], "focus_point": [x, y]} 형식을 받습니다.
+    """
+    if isinstance(spec, dict):
+        unknown = set(spec) - {'region', 'focus_point'}
+        if unknown:
+            raise ValueError(f"알 수 없는 영역 설정 항목: {', '.join(sorted(unknown))}")
+        focus_point = spec.get('focus_point')
+        return tuple(spec['region']), tuple(focus_point) if focus_point is not None else None
+    return tuple(spec), None
+
+def union_region(regions):
+    """여러 영역(x, y, w, h)을 모두 포함하는 (left, top, right, bottom)"""
+    return (min(x for x, _, _, _ in regions), min(y for _, y, _, _ in regions),
+            max(x + w for x, _, w, _ in regions), max(y + h for _, y, _, h in regions))
+
 class FishingBot:
-    def __init__(self):
+    def __init__(self, ui=True, regions=None):
         self.is_running = False
         self.fishing_thread = None
-        self.templates = []  # 여러 템플릿 저장용 리스트
         
-        # 여러 템플릿 이미지 로드 시도
+        # 여러 템플릿 이미지 로드 (전처리 결과는 디스크에 캐시됨)
         template_files = ['exclamation_mark.png', 'exclamation_mark2.png']
-        for file in template_files:
-            try:
-                template = cv2.imread(file)
-                if template is not None:
-                    self.templates.append(template)
-                    print(f"{file} 로드 성공")
-                else:
-                    print(f"{file} 로드 실패")
-            except Exception as e:
-                print(f"{file} 로드 오류: {e}")
+        self.template_bank = TemplateBank(template_files)
+        self.templates = self.template_bank.templates  # 전처리된 템플릿 리스트
+        # 배율 허용 매칭 엔진 (기본 fft: 모든 템플릿을 주파수 영역에서 한 번에 상관)
+        self.matcher = create_matcher(None, self.templates)
         
         if not self.templates:
             print("경고: 사용 가능한 템플릿 이미지가 없습니다")
         
+        # 템플릿 매칭 설정
+        self.threshold = 0.6
+        self.bite_threshold = 0.5   # 낚시 중 입질 판정 임계값
+        self.poll_interval = 0.1    # 캡처 주기 (초)
+        self.bite_timeout = 20      # 입질이 없으면 다시 던질 때까지의 시간 (초)
+        self.use_pipeline = True    # 캡처 스레드 + 링 버퍼 사용 (False면 캡처/매칭/대기를 순서대로)
+        self.last_error = None      # 마지막 실행을 끝낸 오류 (정상 종료면 None)
+        
+        # 감시 영역 (x, y, w, h) - 게임 창마다 하나씩, UI에서는 오버레이 위치를 따라감
+        # 창이 여러 개면 키 입력이 해당 창으로 가도록 focus_point(기본 영역 중심)를 먼저 클릭
+        specs = [parse_region(spec) for spec in (regions or [(0, 0, 400, 400)])]
+        self.regions = [FishingRegion(i, region, focus_point, focus_center=len(specs) > 1)
+                        for i, (region, focus_point) in enumerate(specs)]
+        # 영역이 여러 개면 영역별 매칭을 동시에 실행
+        self.match_executor = None
+        if len(self.regions) > 1:
+            self.match_executor = ThreadPoolExecutor(max_workers=len(self.regions))
+        
+        # 단계별 소요 시간 (METRICS_TEXTFILE / METRICS_SUMMARY, PROFILE 환경 변수로 기록)
+        self.metrics = StageMetrics.from_env('fishing')
+        self.input = create_input(keys='keyboard')  # 키 입력은 게임 창에도 전달되는 keyboard 사용
+        self.profiler = Profiler.from_env('fishing')
+        self.root = None
+        self.overlays = []
+        
+        if ui:
+            self.build_ui()
+
+    def build_ui(self):
+        """메인 창과 영역별 감시 오버레이 생성"""
         # 메인 창 설정
         self.root = tk.Tk()
         self.root.title("낚시 매크로")
         self.root.geometry("300x150")
         
-        # 투명 오버레이 창 설정
-        self.overlay = tk.Toplevel(self.root)
-        self.overlay.geometry("400x400")
-        self.overlay.attributes('-alpha', 1.0)  # 완전 투명으로 변경
-        self.overlay.attributes('-topmost', True)
-        self.overlay.attributes('-transparentcolor', 'white')  # 배경색을 투명하게
-        
-        # 캔버스 생성
-        self.canvas = tk.Canvas(self.overlay, width=400, height=400, 
-                              bg='white',  # 배경을 투명하게 만들 색
-                              highlightthickness=0)  # 캔버스 테두리 제거
-        self.canvas.pack(fill='both', expand=True)
-        
-        # 테두리 그리기
-        self.canvas.create_rectangle(2, 2, 398, 398,  # 여백 2픽셀
-                                   outline='green',    # 테두리 색
-                                   width=4)           # 테두리 두께
-        
-        # 오버레이 창 드래그 가능하도록 설정
-        self.overlay.bind('<Button-1>', self.start_move)
-        self.overlay.bind('<B1-Motion>', self.on_move)
+        for state in self.regions:
+            self.overlays.append(self.create_overlay(state))
         
         # 시작/중지 버튼
         self.toggle_button = tk.Button(self.root, text="시작", command=self.toggle_fishing)
@@ -115,113 +177,281 @@ class FishingBot:
         self.status_label = tk.Label(self.root, text="준비됨")
         self.status_label.pack(pady=10)
         
-        # 템플릿 매칭 설정
-        self.threshold = 0.6
-        
         # 템플릿 이미지가 없으면 버튼 비활성화
         if not self.templates:
             self.toggle_button.config(state='disabled')
             self.status_label.config(text="템플릿 이미지 필요!")
 
-    def start_move(self, event):
+    def create_overlay(self, state):
+        """감시 영역 하나를 표시하는 투명 오버레이 창"""
+        x, y, w, h = state.region
+        overlay = tk.Toplevel(self.root)
+        overlay.geometry(f"{w}x{h}+{x}+{y}")
+        overlay.attributes('-alpha', 1.0)  # 완전 투명으로 변경
+        overlay.attributes('-topmost', True)
+        overlay.attributes('-transparentcolor', 'white')  # 배경색을 투명하게
+        
+        # 캔버스 생성
+        canvas = tk.Canvas(overlay, width=w, height=h, 
+                           bg='white',  # 배경을 투명하게 만들 색
+                           highlightthickness=0)  # 캔버스 테두리 제거
+        canvas.pack(fill='both', expand=True)
+        
+        # 테두리 그리기
+        canvas.create_rectangle(2, 2, w - 2, h - 2,  # 여백 2픽셀
+                                outline='green',    # 테두리 색
+                                width=4)           # 테두리 두께
+        if len(self.regions) > 1:
+            canvas.create_text(12, 12, text=str(state.index + 1), fill='green', anchor='nw')
+        
+        # 오버레이 창 드래그 가능하도록 설정
+        overlay.bind('<Button-1>', lambda event: self.start_move(overlay, event))
+        overlay.bind('<B1-Motion>', lambda event: self.on_move(overlay, event))
+        return overlay
+
+    def start_move(self, overlay, event):
         """오버레이 창 이동 시작"""
-        self.x = event.x
-        self.y = event.y
+        overlay.drag_start = (event.x, event.y)
 
-    def on_move(self, event):
+    def on_move(self, overlay, event):
         """오버레이 창 이동"""
-        deltax = event.x - self.x
-        deltay = event.y - self.y
-        x = self.overlay.winfo_x() + deltax
-        y = self.overlay.winfo_y() + deltay
-        self.overlay.geometry(f"+{x}+{y}")
+        deltax = event.x - overlay.drag_start[0]
+        deltay = event.y - overlay.drag_start[1]
+        x = overlay.winfo_x() + deltax
+        y = overlay.winfo_y() + deltay
+        overlay.geometry(f"+{x}+{y}")
     
-    def get_region(self):
-        """현재 오버레이 창의 위치와 크기 반환"""
-        x = self.overlay.winfo_x()
-        y = self.overlay.winfo_y()
-        return (x, y, 400, 400)
+    def set_status(self, text, state=None):
+        """상태 표시 (UI가 없으면 콘솔에 출력)"""
+        if state is not None and len(self.regions) > 1:
+            text = f"[{state.index + 1}] {text}"
+        if self.root is None:
+            print(text)
+        else:
+            self.status_label.config(text=text)
+
+    def set_button_text(self, text):
+        if self.root is not None:
+            self.toggle_button.config(text=text)
+
+    def get_regions(self):
+        """영역별 현재 감시 영역 (오버레이가 있으면 오버레이 위치로 갱신)"""
+        for state, overlay in zip(self.regions, self.overlays):
+            _, _, w, h = state.region
+            state.region = (overlay.winfo_x(), overlay.winfo_y(), w, h)
+        return [state.region for state in self.regions]
     
     def find_template_match(self, screen_img, threshold=None):
         """모든 템플릿에 대해 이미지 매칭을 수행하고 최고 정확도를 반환합니다"""
+        return self.find_template_matches([screen_img], threshold)[0]
+
+    def find_template_matches(self, screen_imgs, threshold=None, buffers=None):
+        """여러 영역 이미지를 한 번에 매칭하여 영역별 (매칭 여부, 정확도) 목록 반환
+
+        buffers가 주어지면 전처리 결과를 새로 할당하지 않고 영역별 버퍼에 기록합니다.
+        """
         if threshold is None:
             threshold = self.threshold
             
         try:
-            # 이미지 전처리
-            screen_gray = cv2.cvtColor(screen_img, cv2.COLOR_BGR2GRAY)
-            screen_gray = cv2.equalizeHist(screen_gray)
-            screen_gray = cv2.GaussianBlur(screen_gray, (3, 3), 0)
+            # 이미지 전처리 (템플릿은 TemplateBank에서 미리 전처리됨)
+            with self.metrics.stage('preprocess'):
+                buffers = buffers or [None] * len(screen_imgs)
+                screen_grays = [preprocess(screen_img, out=buffer)
+                                for screen_img, buffer in zip(screen_imgs, buffers)]
             
-            max_confidence = 0
-            best_template = None
+            # 축소 피라미드에서 후보를 찾고 여러 배율의 템플릿으로 정밀 매칭
+            with self.metrics.stage('template_match'):
+                results = self.matcher.match_many(screen_grays, threshold=threshold,
+                                                  executor=self.match_executor)
             
-            # 각 템플릿에 대해 매칭 시도
-            for template in self.templates:
-                template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-                template_gray = cv2.equalizeHist(template_gray)
-                template_gray = cv2.GaussianBlur(template_gray, (3, 3), 0)
-                
-                methods = [cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED]
-                
-                for method in methods:
-                    result = cv2.matchTemplate(screen_gray, template_gray, method)
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    
-                    if max_val > max_confidence:
-                        max_confidence = max_val
-                        best_template = template
-                    
-                    if max_val > threshold:
-                        print(f"매칭 발견: 정확도={max_val:.3f}")
-                        return True, max_val
-            
-            print(f"매칭 실패: 최대 정확도={max_confidence:.3f}, 임계값={threshold}")
-            return False, max_confidence
+            matches = []
+            for result in results:
+                max_confidence = result.score
+                if max_confidence > threshold:
+                    print(f"매칭 발견: 정확도={max_confidence:.3f}, 배율={result.scale}")
+                    matches.append((True, max_confidence))
+                else:
+                    print(f"매칭 실패: 최대 정확도={max_confidence:.3f}, 임계값={threshold}")
+                    matches.append((False, max_confidence))
+            return matches
             
         except Exception as e:
             print(f"템플릿 매칭 오류: {e}")
-            return False, 0.0
+            return [(False, 0.0)] * len(screen_imgs)
 
-    def run_fishing_macro(self):
-        is_fishing = False
-        last_fish_time = 0
+    def sleep(self, seconds):
+        """대기 시간도 'sleep' 단계로 기록"""
+        with self.metrics.stage('sleep'):
+            time.sleep(seconds)
+
+    def press_key(self, key, state=None):
+        with self.metrics.stage('input'):
+            focus = state.focus_target() if state is not None else None
+            if focus is not None:
+                # 키 입력은 활성 창으로 가므로 해당 게임 창을 먼저 클릭
+                self.input.click(*focus)
+            self.input.press(key)
+
+    def step(self, state, now, view, watching):
+        """영역 하나의 상태를 진행 (입질 감시가 필요하면 watching에 추가)"""
+        if now < state.resume_at:
+            return
+        
+        if state.state == 'idle':
+            self.press_key('e', state)
+            state.state = 'fishing'
+            self.set_status("낚시 시작...", state)
+            state.resume_at = state.last_fish_time = now + 1.5
+            state.change_detector.reset()
+        
+        elif state.state == 'reeling':
+            self.press_key('e', state)
+            self.set_status(f"물고기 낚음! (정확도: {state.confidence:.3f})", state)
+            state.state = 'idle'
+            state.resume_at = now + random.uniform(1.0, 5.0)
+        
+        elif now - state.last_fish_time > self.bite_timeout:
+            state.state = 'idle'
+            self.set_status(
+                f"타임아웃 - 다시 시작 (매칭 생략 {state.change_detector.skip_ratio:.0%})", state)
+            state.resume_at = now + random.uniform(1.0, 2.0)
+        
+        else:
+            # 이전에 매칭한 프레임과 차이가 없으면 매칭 생략
+            with self.metrics.stage('change_detect'):
+                changed = state.change_detector.should_process(view)
+            if changed:
+                watching.append((state, view))
+
+    def process_frame(self, screen, bbox, regions, now):
+        """한 번에 캡처한 화면에서 영역별 상태를 진행하고 입질 확인이 필요한 영역을 묶어 매칭"""
+        left, top, _, _ = bbox
+        watching = []
+        for state, (x, y, w, h) in zip(self.regions, regions):
+            # 영역별로 잘라서 사용 (복사 없는 view)
+            view = screen[y - top:y - top + h, x - left:x - left + w]
+            self.step(state, now, view, watching)
+        
+        if not watching:
+            return
+        buffers = []
+        for state, view in watching:
+            if state.buffer is None or state.buffer.shape != view.shape:
+                state.buffer = np.empty(view.shape, np.uint8)
+            buffers.append(state.buffer)
+        matches = self.find_template_matches([view for _, view in watching],
+                                             threshold=self.bite_threshold, buffers=buffers)
+        for (state, _), (matched, confidence) in zip(watching, matches):
+            if matched:
+                state.state = 'reeling'
+                state.confidence = confidence
+                state.resume_at = now + random.uniform(0.2, 0.4)
+
+    def stop_on_no_screen(self):
+        # replay 백엔드의 재생이 끝난 경우
+        self.set_status("캡처할 화면이 없습니다")
+        self.is_running = False
+        self.set_button_text("시작")
+
+    def run_sequential(self):
+        """캡처 -> 매칭 -> 대기를 한 스레드에서 순서대로 실행"""
+        while self.is_running:
+            cycle_start = perf_counter()
+            regions = self.get_regions()
+            
+            # 모든 영역을 한 번에 캡처
+            left, top, right, bottom = bbox = union_region(regions)
+            with self.metrics.stage('capture'):
+                screen = capture_screen_region((left, top, right - left, bottom - top))
+            if screen is None:
+                self.stop_on_no_screen()
+                break
+            
+            self.process_frame(screen, bbox, regions, time.time())
+            
+            # 다음 캡처 주기 또는 가장 가까운 예약 동작까지 대기
+            now = time.time()
+            delay = min([self.poll_interval] +
+                        [state.resume_at - now for state in self.regions if state.resume_at > now])
+            self.sleep(delay)
+            self.metrics.observe('cycle', perf_counter() - cycle_start)
+            self.metrics.maybe_flush()
+
+    def run_pipeline(self):
+        """캡처 스레드가 링 버퍼를 채우고, 이 스레드는 항상 최신 프레임만 처리
+
+        매칭이 느려도 캡처 주기가 밀리지 않으며, 처리하지 못한 프레임은 버립니다.
+        """
+        def target():
+            regions = self.get_regions()
+            bbox = union_region(regions)
+            return bbox, (bbox, regions)
         
+        left, top, right, bottom = union_region(self.get_regions())
+        ring = FrameRing((bottom - top, right - left))
+        producer = CaptureThread(ring, capture.grab_into, target, self.poll_interval)
+        producer.start()
+        
+        last_seq = 0
         try:
             while self.is_running:
-                region = self.get_region()
-                screen = capture_screen_region(region)
-                
-                if not is_fishing:
-                    keyboard.press_and_release('e')
-                    is_fishing = True
-                    self.status_label.config(text="낚시 시작...")
-                    time.sleep(1.5)
-                    last_fish_time = time.time()
-                    
-                elif is_fishing:
-                    matched, confidence = self.find_template_match(screen, threshold=0.5)
-                    
-                    if matched:
-                        time.sleep(random.uniform(0.2, 0.4))
-                        keyboard.press_and_release('e')
-                        self.status_label.config(text=f"물고기 낚음! (정확도: {confidence:.3f})")
-                        is_fishing = False
-                        next_delay = random.uniform(1.0, 5.0)
-                        time.sleep(next_delay)
-                    
-                    elif time.time() - last_fish_time > 20:
-                        is_fishing = False
-                        self.status_label.config(text="타임아웃 - 다시 시작")
-                        time.sleep(random.uniform(1.0, 2.0))
+                frame = ring.get_latest(last_seq, timeout=1.0)
+                if frame is None:
+                    if ring.closed:
+                        self.stop_on_no_screen()
+                        break
+                    continue
                 
-                time.sleep(0.1)
+                cycle_start = perf_counter()
+                try:
+                    if last_seq and frame.seq - last_seq > 1:
+                        self.metrics.increment('frame_dropped', frame.seq - last_seq - 1)
+                    last_seq = frame.seq
+                    self.metrics.observe('frame_age', ring.last_age)
+                    bbox, regions = frame.meta
+                    self.process_frame(frame.image, bbox, regions, time.time())
+                finally:
+                    ring.release(frame)
+                self.metrics.observe('cycle', perf_counter() - cycle_start)
+                self.metrics.maybe_flush()
+        finally:
+            producer.stop()
+            producer.join(timeout=1.0)
+            print(f"캡처 {ring.produced}프레임, 처리 {ring.consumed}프레임, "
+                  f"버린 프레임 {ring.dropped} ({ring.drop_ratio:.1%})")
+
+    def run_fishing_macro(self):
+        self.last_error = None
+        for state in self.regions:
+            state.state = 'idle'
+            state.resume_at = 0.0
+        
+        # 프로파일러는 이 작업 스레드를 측정
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            if self.use_pipeline:
+                self.run_pipeline()
+            else:
+                self.run_sequential()
                 
         except Exception as e:
             print(f"오류 발생: {e}")
-            self.status_label.config(text=f"오류: {str(e)}")
+            self.set_status(f"오류: {str(e)}")
+            self.last_error = e
             self.is_running = False
-            self.toggle_button.config(text="시작")
+            self.set_button_text("시작")
+        
+        if self.profiler is not None:
+            self.profiler.stop()
+        for state in self.regions:
+            detector = state.change_detector
+            print(f"[{state.index + 1}] 매칭 생략 비율: {detector.skip_ratio:.1%} "
+                  f"({detector.skipped}/{detector.checked})")
+        for line in self.metrics.summary_lines():
+            print(line)
+        self.metrics.close()
 
     def toggle_fishing(self):
         if not self.templates:
@@ -243,6 +473,22 @@ class FishingBot:
     def run(self):
         self.root.mainloop()
 
+    def run_headless(self):
+        """UI 없이 현재 스레드에서 바로 실행 (Ctrl+C로 종료)"""
+        self.is_running = True
+        try:
+            self.run_fishing_macro()
+        except KeyboardInterrupt:
+            self.is_running = False
+
 if __name__ == "__main__":
-    bot = FishingBot()
+    # 사용법: python fishing-ark.py [게임 창 수 | 영역 설정.json]
+    # 영역 설정 파일: [{"region": [0, 0, 400, 400], "focus_point": [200, 10]}, [420, 0, 400, 400]]
+    arg = sys.argv[1] if len(sys.argv) > 1 else '1'
+    if arg.isdigit():
+        regions = [(i * 420, 0, 400, 400) for i in range(int(arg))]
+    else:
+        with open(arg, encoding='utf-8') as f:
+            regions = json.load(f)
+    bot = FishingBot(regions=regions)
     bot.run()
\ No newline at end of file
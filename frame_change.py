@@ -0,0 +1,78 @@
+import cv2
+import numpy as np
+
+class FrameChangeDetector:
+    """축소한 프레임의 절대 차이로 화면 변화를 감지하여 비싼 매칭을 건너뜁니다"""
+
+    def __init__(self, scale=0.25, pixel_threshold=16, min_changed_pixels=4, max_skip=10):
+        self.scale = scale                           # 비교용 축소 비율
+        self.pixel_threshold = pixel_threshold       # 변화로 볼 픽셀 밝기 차이
+        self.min_changed_pixels = min_changed_pixels # 변화로 볼 최소 픽셀 수
+        self.max_skip = max_skip                     # 연속으로 건너뛸 수 있는 최대 프레임 수
+        self.checked = 0
+        self.skipped = 0
+        self.reset()
+
+    def reset(self):
+        """기준 프레임 초기화 (다음 프레임은 항상 처리)"""
+        self.reference = None
+        self.skipped_in_row = 0
+
+    def signature(self, frame):
+        """비교용 축소 그레이스케일 이미지"""
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale,
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def differs(self, signature_a, signature_b):
+        """두 축소 이미지 사이에 의미 있는 변화가 있는지"""
+        if signature_a.shape != signature_b.shape:
+            return True
+        diff = cv2.absdiff(signature_a, signature_b)
+        return np.count_nonzero(diff > self.pixel_threshold) >= self.min_changed_pixels
+
+    def should_process(self, frame):
+        """마지막으로 처리한 프레임 대비 변화가 있으면 True"""
+        self.checked += 1
+        signature = self.signature(frame)
+
+        if (self.reference is not None
+                and self.skipped_in_row < self.max_skip
+                and not self.differs(signature, self.reference)):
+            self.skipped += 1
+            self.skipped_in_row += 1
+            return False
+
+        # 처리한 프레임을 다음 비교의 기준으로 삼음 (max_skip마다 강제로 다시 처리)
+        self.reference = signature
+        self.skipped_in_row = 0
+        return True
+
+    @property
+    def skip_ratio(self):
+        if self.checked == 0:
+            return 0.0
+        return self.skipped / self.checked
+
+def dhash(image, hash_size=8, margin=0):
+    """차이 해시 - 인접 픽셀이 margin보다 밝아지는지/어두워지는지를 비트로 기록
+
+    hash_size는 정수 또는 (가로, 세로)이며, margin을 주면 평탄한 영역의 잡음에 강해집니다.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if isinstance(hash_size, int):
+        hash_size = (hash_size, hash_size)
+    width, height = hash_size
+    small = cv2.resize(image, (width + 1, height), interpolation=cv2.INTER_AREA).astype(np.int16)
+    diff = small[:, 1:] - small[:, :-1]
+    bits = np.concatenate([(diff > margin).ravel(), (diff < -margin).ravel()])
+    return np.packbits(bits).tobytes()
+
+def hamming(hash_a, hash_b):
+    """두 해시의 서로 다른 비트 수"""
+    a = np.frombuffer(hash_a, dtype=np.uint8)
+    b = np.frombuffer(hash_b, dtype=np.uint8)
+    return int(np.unpackbits(a ^ b).sum())
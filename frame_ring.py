@@ -0,0 +1,144 @@
+import time
+import threading
+from collections import namedtuple
+import numpy as np
+
+Frame = namedtuple('Frame', ['seq', 'timestamp', 'image', 'meta', 'slot'])
+
+class FrameRing:
+    """미리 할당한 프레임 버퍼 링 - 캡처 스레드가 쓰고, 소비자는 항상 최신 프레임만 가져감
+
+    소비자가 읽지 못한 채 새 프레임으로 덮인 프레임은 dropped로 셉니다.
+    소비자 하나가 프레임 하나를 읽는 동안에도 생산자가 쓸 빈 버퍼가 남도록 최소 3개를 사용합니다.
+    """
+
+    def __init__(self, shape, size=3, dtype=np.uint8):
+        if size < 3:
+            raise ValueError("링 버퍼는 최소 3개가 필요합니다")
+        self.size = size
+        self.dtype = dtype
+        self.shape = None
+        self.buffers = []
+        self.cond = threading.Condition()
+        self.seq = 0                # 마지막으로 게시된 프레임 번호
+        self.latest = None          # (slot, timestamp, meta)
+        self.latest_read = True     # 마지막 프레임을 소비자가 가져갔는지
+        self.reading = set()        # 소비자가 사용 중인 버퍼
+        self.next_slot = 0
+        self.closed = False
+        self.produced = 0
+        self.consumed = 0
+        self.dropped = 0
+        self.last_age = 0.0         # 마지막으로 가져간 프레임의 캡처 후 경과 시간 (초)
+        self.ensure_shape(shape)
+
+    def ensure_shape(self, shape):
+        """캡처 크기가 바뀌면 버퍼를 새로 할당 (읽는 중인 이전 버퍼는 소비자가 계속 사용)"""
+        shape = tuple(shape)
+        with self.cond:
+            if shape == self.shape:
+                return
+            self.shape = shape
+            self.buffers = [np.empty(shape, self.dtype) for _ in range(self.size)]
+            self.reading = set()
+            if self.latest is not None and not self.latest_read:
+                self.dropped += 1
+            self.latest = None
+            self.latest_read = True
+
+    def acquire_write(self):
+        """생산자가 기록할 (slot, 버퍼) - 최신 프레임과 읽는 중인 버퍼는 피함"""
+        with self.cond:
+            latest_slot = self.latest[0] if self.latest is not None else None
+            for _ in range(self.size):
+                slot = self.next_slot
+                self.next_slot = (self.next_slot + 1) % self.size
+                if slot != latest_slot and slot not in self.reading:
+                    return slot, self.buffers[slot]
+        raise RuntimeError("기록할 수 있는 버퍼가 없습니다")
+
+    def publish(self, slot, timestamp, meta=None):
+        """기록을 마친 버퍼를 최신 프레임으로 게시 (timestamp는 perf_counter 기준 캡처 시각)"""
+        with self.cond:
+            if not self.latest_read:
+                self.dropped += 1
+            self.seq += 1
+            self.produced += 1
+            self.latest = (slot, timestamp, meta)
+            self.latest_read = False
+            self.cond.notify_all()
+
+    def get_latest(self, last_seq=0, timeout=None):
+        """last_seq 이후의 최신 프레임을 기다려 반환 (시간 초과나 종료 시 None)
+
+        사용이 끝나면 release()로 반납해야 합니다.
+        """
+        with self.cond:
+            ready = self.cond.wait_for(
+                lambda: self.closed or (self.seq > last_seq and self.latest is not None), timeout)
+            if not ready or self.seq <= last_seq or self.latest is None:
+                return None
+            slot, timestamp, meta = self.latest
+            self.reading.add(slot)
+            self.latest_read = True
+            self.consumed += 1
+            self.last_age = time.perf_counter() - timestamp
+            return Frame(self.seq, timestamp, self.buffers[slot], meta, slot)
+
+    def release(self, frame):
+        with self.cond:
+            if frame.image is self.buffers[frame.slot]:
+                self.reading.discard(frame.slot)
+
+    def close(self):
+        """생산 종료 - 기다리는 소비자를 깨움"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    @property
+    def drop_ratio(self):
+        if self.produced == 0:
+            return 0.0
+        return self.dropped / self.produced
+
+class CaptureThread(threading.Thread):
+    """일정한 주기로 화면을 캡처하여 FrameRing을 채우는 생산자 스레드
+
+    get_target()은 (bbox, meta)를 반환하고, grab_into(bbox, out)은 out에 그레이스케일
+    캡처를 기록합니다. 캡처가 실패하면(재생 종료 등) 링을 닫고 끝납니다.
+    """
+
+    def __init__(self, ring, grab_into, get_target, interval):
+        super().__init__(daemon=True)
+        self.ring = ring
+        self.grab_into = grab_into
+        self.get_target = get_target
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        try:
+            next_time = time.perf_counter()
+            while not self._stop_event.is_set():
+                bbox, meta = self.get_target()
+                left, top, right, bottom = bbox
+                self.ring.ensure_shape((bottom - top, right - left))
+                slot, buffer = self.ring.acquire_write()
+                captured = time.perf_counter()
+                if not self.grab_into(bbox, buffer):
+                    break
+                self.ring.publish(slot, captured, meta)
+
+                # 캡처 시각이 밀리지 않도록 절대 시각 기준으로 대기 (늦어지면 기준을 다시 잡음)
+                next_time += self.interval
+                delay = next_time - time.perf_counter()
+                if delay <= 0:
+                    next_time = time.perf_counter()
+                elif self._stop_event.wait(delay):
+                    break
+        finally:
+            self.ring.close()
@@ -1,13 +1,24 @@
-import pytesseract
-from PIL import ImageGrab, Image
-import pyautogui
+import ocr_engine
 import time
-import schedule
-from datetime import datetime
-import numpy as np
+from datetime import datetime, timedelta
 import logging
 import os
-import cv2
+import threading
+from lazy_import import lazy_import
+from screen_capture import create_backend
+from adaptive_scheduler import AdaptiveScheduler, parse_time
+from frame_change import dhash, hamming
+from ui_wait import ScreenWatcher, wait_until
+from anchor_cache import AnchorCache
+from window_locator import find_window_candidates
+from slot_grid import extract_slots, parse_time_text
+from slot_decision import SlotPreferences, PreferenceWindow, SlotDecider
+from metrics import StageMetrics, Profiler
+from release_sniper import ReleaseSniper
+from input_backend import create_input
+
+# 무거운 의존성은 처음 사용할 때 import (시작 시간 단축)
+pytesseract = lazy_import('pytesseract')
 
 # 로깅 설정
 logging.basicConfig(
@@ -19,57 +30,139 @@ logging.basicConfig(
     ]
 )
 
+class OcrResult:
+    """한 프레임에 대한 image_to_data 결과 (단어, 박스, 신뢰도)"""
+
+    def __init__(self, data):
+        self.words = []        # 단어 텍스트
+        self.boxes = []        # (x, y, w, h) - 캡처 영역 기준 좌표
+        self.confidences = []  # 단어별 신뢰도
+
+        for i, text in enumerate(data['text']):
+            text = text.strip()
+            if not text:
+                continue
+            self.words.append(text)
+            self.boxes.append((data['left'][i], data['top'][i],
+                               data['width'][i], data['height'][i]))
+            self.confidences.append(float(data['conf'][i]))
+
+    @classmethod
+    def from_image(cls, image, profile='default', engine=ocr_engine):
+        """이미지에 OCR 프로필로 OCR을 한 번 수행하여 결과 객체 생성"""
+        data = ocr_engine.get_profile(profile).image_to_data(image, engine=engine)
+        return cls(data)
+
+    def shift(self, dx, dy):
+        """잘라낸 이미지의 결과를 원래 이미지 좌표로 이동"""
+        self.boxes = [(x + dx, y + dy, w, h) for x, y, w, h in self.boxes]
+        return self
+
+    def find_box(self, search_text):
+        """특정 텍스트를 포함하는 첫 단어의 박스 (x, y, w, h) 반환"""
+        for word, box in zip(self.words, self.boxes):
+            if search_text in word:
+                return box
+        return None
+
 class GolfReservation:
-    def __init__(self):
+    def __init__(self, name=None, capture=None, ocr=None, input_lock=None, metrics=None,
+                 anchor_path='.anchor_cache.npz', profile=True):
+        """capture/ocr/input_lock/metrics를 주면 새로 만들지 않고 공유 (여러 세션 실행용)"""
+        self.name = name
         self.app_region = None
+        self.last_app_window = None  # 마지막으로 앱을 찾은 창 영역 (재감지 시 먼저 확인)
+        self.window = None           # 앱을 찾을 창 영역 (여러 창을 동시에 실행할 때 지정)
         self.target_start_time = 20  # 목표 시작 시간 (24시간 형식)
         self.target_end_time = 22    # 목표 종료 시간 (24시간 형식)
         self.drag_distance = 200  # 끌어당길 거리 (픽셀)
+        self.drag_duration = 0.2  # 끌어당기는 시간 (초)
         self.current_reservation = None  # 현재 예약된 시간 저장
         
+        # 시간대 선호도 - 비어 있으면 target_start_time~target_end_time 구간(가중치 target_weight)
+        self.preference_windows = []     # [("HH:MM", "HH:MM", 가중치), ...]
+        self.target_weight = 1.0
+        self.weekday_weights = {}        # {"sat": 1.0, "mon": None(제외), ...} - 예약하는 날 기준
+        self.booking_days_ahead = 0      # 시간대 목록 화면이 보여주는 날짜 (오늘부터 며칠 뒤)
+        self.slot_decider = None         # 지난 새로고침과 비교하여 새로 생긴 시간대만 평가
+        self.capture = capture or create_backend()  # 화면 캡처 백엔드 (mss / PIL / replay)
+        self.watcher = ScreenWatcher(self.capture)  # 고정 대기 대신 화면 준비 상태 감시
+        self.input = create_input()  # 입력 백엔드 (INPUT_BACKEND: fast / human / pyautogui / record)
+        self.input_lock = input_lock or threading.Lock()  # 여러 세션이 마우스 입력을 섞지 않도록 공유하는 잠금
+        
+        # 위치가 고정된 버튼은 한 번 OCR로 찾은 뒤 이미지 조각으로 다시 확인
+        self.anchor_texts = ("줄서기", "확인", "예약취소")
+        self.anchors = AnchorCache(anchor_path)
+        
+        # 확인 주기 설정
+        self.idle_interval = 300         # 목표 시간대와 먼 시각의 확인 주기 (초)
+        self.active_interval = 5         # 목표 시간대 근처의 확인 주기 (초)
+        self.active_lead_minutes = 60    # 목표 시작 몇 분 전부터 빠르게 확인할지
+        self.release_times = []          # 예약이 열리는 시각 목록 ("HH:MM")
+        self.release_window_minutes = (2, 10)  # 오픈 시각 전후로 빠르게 확인할 시간 (분)
+        
+        # 오픈 시각 집중 모드 - 오픈 직전에 준비를 마치고 오픈 후 짧은 주기로 새로고침/예약
+        self.release_sniper = False
+        self.sniper_lead_seconds = 30     # 오픈 몇 초 전부터 준비할지 (active_interval보다 길어야 함)
+        self.sniper_window_seconds = 60   # 오픈 후 집중 확인할 시간
+        self.sniper_interval = 0.3        # 집중 확인 주기 (초)
+        self.sniped_releases = set()      # 이미 집중 확인한 오픈 시각
+        
+        # OCR 설정 - ocr_workers가 1 이상이면 영역을 가로 띠로 나눠 병렬 OCR
+        self.ocr_workers = 0
+        self.ocr = ocr or ocr_engine
+        
+        # 영역별 OCR 프로필 (ocr_engine.PROFILES)
+        self.slot_profile = 'default'         # 시간대 목록 (slot_area)
+        self.button_profile = 'button_label'  # 버튼 글자 찾기
+        self.time_profile = 'time_cell'       # 시간을 읽지 못한 줄의 시간 칸 재인식
+        
+        # 시간대 목록 화면이 지난 확인 때와 같으면 OCR 생략
+        self.slot_area = None          # 해시를 계산할 영역 (app_region 기준, None이면 전체)
+        self.slot_hash_scale = 0.25    # 해시 해상도 (작은 글자 하나의 변화도 잡을 수 있어야 함)
+        self.slot_hash_margin = 4      # 밝기 차이가 이 값 이하면 평탄한 영역으로 봄
+        self.slot_hash_threshold = 0   # 같은 화면으로 볼 최대 비트 차이
+        self.slot_cache = None         # (앱 영역, 해시, OcrResult, 예약 가능 시간 목록)
+        self.ocr_passes = 0
+        self.ocr_skipped = 0
+        self.last_error = None         # 마지막 run()을 끝낸 오류 (정상 종료면 None)
+        
+        # 단계별 소요 시간 (METRICS_TEXTFILE / METRICS_SUMMARY, PROFILE 환경 변수로 기록)
+        self.metrics = metrics or StageMetrics.from_env('golf_reservation')
+        self.profiler = Profiler.from_env('golf_reservation') if profile else None
+        
     def find_app_region(self):
-        """앱플레이어 영역 자동 감지"""
+        """앱플레이어 영역 자동 감지
+
+        크게 축소한 화면에서 찾은 창 후보(와 마지막으로 감지한 창) 안에서만 먼저 OCR하고,
+        확인되지 않을 때만 전체 화면을 OCR합니다.
+        """
         try:
-            # 전체 화면 캡처
-            screenshot = ImageGrab.grab()
-            screenshot_np = np.array(screenshot)
-            
-            # 이미지를 그레이스케일로 변환
-            gray = cv2.cvtColor(screenshot_np, cv2.COLOR_RGB2BGR)
-            gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY)
-            
-            # OCR로 특정 텍스트 찾기 ("바로입장", "타석 색상안내" 등)
-            data = pytesseract.image_to_data(gray, lang='kor', output_type=pytesseract.Output.DICT)
+            # 전체 화면을 그레이스케일로 바로 캡처
+            with self.metrics.stage('capture'):
+                gray = self.capture.grab(gray=True)
             
-            target_texts = ["바로입장", "타석", "색상안내", "예약"]
-            found_regions = []
+            if self.window is not None:
+                # 창이 지정되면 그 안에서만 찾음
+                candidates = [self.window]
+            else:
+                with self.metrics.stage('preprocess'):
+                    candidates = find_window_candidates(gray)
+                if self.last_app_window is not None:
+                    candidates.insert(0, self.last_app_window)
             
-            for i, text in enumerate(data['text']):
-                if any(target in text for target in target_texts):
-                    x = data['left'][i]
-                    y = data['top'][i]
-                    w = data['width'][i]
-                    h = data['height'][i]
-                    found_regions.append((x, y, w, h))
+            for window in candidates:
+                # 후보 창은 목표 텍스트가 2개 이상 보일 때만 앱으로 확정
+                app_region = self.detect_app_in(gray, window, min_matches=2)
+                if app_region is not None:
+                    self.last_app_window = window
+                    logging.info(f"앱 영역 감지 성공: {app_region} (창 후보 {window})")
+                    return app_region
             
-            if found_regions:
-                # 발견된 모든 영역을 포함하는 경계 상자 계산
-                min_x = min(r[0] for r in found_regions)
-                min_y = min(r[1] for r in found_regions)
-                max_x = max(r[0] + r[2] for r in found_regions)
-                max_y = max(r[1] + r[3] for r in found_regions)
-                
-                # 여백 추가
-                padding = 50
-                screen_width, screen_height = screenshot.size
-                
-                app_region = (
-                    max(0, min_x - padding),
-                    max(0, min_y - padding),
-                    min(screen_width, max_x + padding),
-                    min(screen_height, max_y + padding)
-                )
-                
+            # 후보에서 찾지 못하면 전체 화면(창이 지정되면 창 전체) OCR
+            app_region = self.detect_app_in(gray, self.window)
+            if app_region is not None:
+                self.last_app_window = app_region
                 logging.info(f"앱 영역 감지 성공: {app_region}")
                 return app_region
             
@@ -79,68 +172,138 @@ class GolfReservation:
             logging.error(f"앱 영역 감지 실패: {str(e)}")
             return None
 
+    def detect_app_in(self, gray, window=None, min_matches=1):
+        """window 영역(None이면 전체 화면)을 OCR하여 앱 영역 계산"""
+        left, top = 0, 0
+        image = gray
+        if window is not None:
+            left, top, right, bottom = window
+            image = gray[top:bottom, left:right]
+        
+        # OCR로 특정 텍스트 찾기 ("바로입장", "타석 색상안내" 등)
+        with self.metrics.stage('ocr'):
+            data = self.ocr.image_to_data(image, lang='kor')
+        
+        target_texts = ["바로입장", "타석", "색상안내", "예약"]
+        found_regions = []
+        
+        for i, text in enumerate(data['text']):
+            if any(target in text for target in target_texts):
+                x = left + data['left'][i]
+                y = top + data['top'][i]
+                w = data['width'][i]
+                h = data['height'][i]
+                found_regions.append((x, y, w, h))
+        
+        if len(found_regions) < min_matches:
+            return None
+        
+        # 발견된 모든 영역을 포함하는 경계 상자 계산
+        min_x = min(r[0] for r in found_regions)
+        min_y = min(r[1] for r in found_regions)
+        max_x = max(r[0] + r[2] for r in found_regions)
+        max_y = max(r[1] + r[3] for r in found_regions)
+        
+        # 여백 추가
+        padding = 50
+        screen_height, screen_width = gray.shape[:2]
+        
+        return (
+            max(0, min_x - padding),
+            max(0, min_y - padding),
+            min(screen_width, max_x + padding),
+            min(screen_height, max_y + padding)
+        )
+
     def capture_screen(self, region=None):
-        """화면 캡처"""
+        """화면 캡처 (OCR용 그레이스케일 numpy 배열)"""
         try:
-            screenshot = ImageGrab.grab(bbox=region)
-            return screenshot
+            with self.metrics.stage('capture'):
+                return self.capture.grab(region, gray=True)
         except Exception as e:
             logging.error(f"화면 캡처 실패: {str(e)}")
             return None
 
-    def extract_text_from_image(self, image):
-        """이미지에서 텍스트 추출"""
-        try:
-            text = pytesseract.image_to_string(image, lang='kor')
-            return text.strip()
-        except Exception as e:
-            logging.error(f"텍스트 추출 실패: {str(e)}")
-            return ""
+    def locate_text(self, region, text, ocr=None):
+        """영역에서 텍스트를 찾아 화면 좌표(중심) 반환 (ocr이 주어지면 해당 결과를 재사용)
 
-    def find_text_location(self, image, search_text):
-        """이미지에서 특정 텍스트의 위치를 찾는 함수"""
-        try:
-            data = pytesseract.image_to_data(image, lang='kor', output_type=pytesseract.Output.DICT)
-            
-            for i, text in enumerate(data['text']):
-                if search_text in text:
-                    x = data['left'][i]
-                    y = data['top'][i]
-                    w = data['width'][i]
-                    h = data['height'][i]
-                    return (x + w//2, y + h//2)
-            return None
-        except Exception as e:
-            logging.error(f"텍스트 위치 찾기 실패: {str(e)}")
+        anchor_texts에 있는 버튼은 기억한 위치를 먼저 확인하고,
+        맞지 않을 때만 OCR로 찾은 뒤 위치를 갱신합니다.
+        """
+        is_anchor = text in self.anchor_texts and self.app_region is not None
+        if ocr is None and is_anchor:
+            with self.metrics.stage('template_match'):
+                location = self.anchors.lookup(self.capture, text, self.app_region)
+            if location is not None:
+                return location
+        
+        screenshot = None
+        if ocr is None:
+            screenshot = self.capture_screen(region)
+            if screenshot is None:
+                return None
+            profile = self.button_profile if is_anchor else 'default'
+            with self.metrics.stage('ocr'):
+                ocr = OcrResult.from_image(screenshot, profile=profile, engine=self.ocr)
+        
+        box = ocr.find_box(text)
+        if box is None:
             return None
+        x, y, w, h = box
+        
+        if screenshot is not None and is_anchor:
+            # 앱 영역 기준 위치와 버튼 이미지 조각 저장
+            anchor_box = (region[0] - self.app_region[0] + x, region[1] - self.app_region[1] + y, w, h)
+            self.anchors.remember(text, self.app_region, anchor_box, screenshot[y:y + h, x:x + w])
+        
+        return (region[0] + x + w//2, region[1] + y + h//2)
+
+    def click_at(self, location, text):
+        """화면 좌표 클릭"""
+        click_x, click_y = location
+        with self.input_lock, self.metrics.stage('input'):
+            self.input.click(click_x, click_y)
+        logging.info(f"클릭 성공: {text} at ({click_x}, {click_y})")
+        return True
 
-    def click_text(self, region, text):
-        """특정 영역에서 텍스트를 찾아 클릭"""
+    def click_text(self, region, text, ocr=None):
+        """특정 영역에서 텍스트를 찾아 클릭 (ocr이 주어지면 해당 결과를 재사용)"""
         try:
-            screenshot = self.capture_screen(region)
-            if screenshot is None:
-                return False
-                
-            location = self.find_text_location(screenshot, text)
+            location = self.locate_text(region, text, ocr=ocr)
             if location:
-                x, y = location
-                click_x = region[0] + x
-                click_y = region[1] + y
-                pyautogui.click(click_x, click_y)
-                logging.info(f"클릭 성공: {text} at ({click_x}, {click_y})")
-                return True
+                return self.click_at(location, text)
             return False
         except Exception as e:
             logging.error(f"텍스트 클릭 실패: {str(e)}")
             return False
 
+    def wait_for_text(self, region, text, timeout, reference=None):
+        """영역에 텍스트가 보일 때까지 대기하여 화면 좌표 반환 (시간 초과 시 None)
+
+        reference가 주어지면 먼저 화면이 바뀌고 안정될 때까지 기다린 뒤 찾습니다.
+        """
+        deadline = time.monotonic() + timeout
+        if reference is not None:
+            with self.metrics.stage('wait'):
+                self.watcher.wait_for_update(region, reference, timeout)
+        
+        return wait_until(lambda: self.locate_text(region, text),
+                          max(0.0, deadline - time.monotonic()), interval=0.1)
+
+    def slot_preferences(self):
+        """설정으로 시간대 선호도 생성"""
+        windows = [PreferenceWindow(*window) for window in self.preference_windows]
+        if not windows:
+            windows = [PreferenceWindow(self.target_start_time, self.target_end_time + 1,
+                                        self.target_weight)]
+        return SlotPreferences(windows, self.weekday_weights)
+
     def is_time_in_range(self, target_time):
-        """시간이 목표 범위 안에 있는지 확인"""
-        target_hour = target_time.hour
-        return self.target_start_time <= target_hour <= self.target_end_time
+        """시간이 선호 구간(기본: 목표 시작~종료 시각) 안에 있는지 확인"""
+        return self.slot_preferences().score(target_time) is not None
 
-    def pull_to_refresh(self):
-        """끌어당겨 새로고침 수행"""
+    def pull_to_refresh(self, duration=None, timeout=6):
+        """끌어당겨 새로고침 수행 (duration: 드래그 시간(기본 drag_duration), timeout: 화면 안정 대기 최대 시간)"""
         try:
             if self.app_region is None:
                 return
@@ -149,14 +312,19 @@ class GolfReservation:
             center_x = self.app_region[0] + (self.app_region[2] - self.app_region[0]) // 2
             start_y = self.app_region[1] + 100  # 상단에서 약간 아래 지점
             
-            # 드래그 동작 수행
-            pyautogui.moveTo(center_x, start_y)
-            pyautogui.mouseDown()
-            pyautogui.moveTo(center_x, start_y + self.drag_distance, duration=0.5)
-            pyautogui.mouseUp()
+            reference = self.watcher.snapshot(self.app_region)
+            
+            # 드래그 동작 수행 (드래그 중에는 다른 세션이 입력하지 않도록 잠금)
+            with self.input_lock, self.metrics.stage('input'):
+                self.input.drag((center_x, start_y), (center_x, start_y + self.drag_distance),
+                                self.drag_duration if duration is None else duration)
             
             logging.info("끌어당겨 새로고침 완료")
-            time.sleep(3)  # 새로고침 완료 대기
+            # 목록이 바뀌고 안정될 때까지 대기
+            with self.metrics.stage('wait'):
+                updated = self.watcher.wait_for_update(self.app_region, reference, timeout=timeout)
+            if not updated:
+                logging.warning("새로고침 후 화면이 안정되지 않았습니다")
             
         except Exception as e:
             logging.error(f"새로고침 실패: {str(e)}")
@@ -168,9 +336,11 @@ class GolfReservation:
                 return False
                 
             # 줄서기 텍스트 찾아 클릭
+            reference = self.watcher.snapshot(self.app_region)
             if self.click_text(self.app_region, "줄서기"):
                 logging.info("줄서기 탭 선택 완료")
-                time.sleep(2)  # 탭 전환 대기
+                with self.metrics.stage('wait'):
+                    self.watcher.wait_for_update(self.app_region, reference, timeout=4)  # 탭 전환 대기
                 return True
                 
             logging.error("줄서기 탭을 찾을 수 없습니다")
@@ -181,31 +351,177 @@ class GolfReservation:
             return False
 
     def is_better_time(self, new_time):
-        """새로운 시간이 현재 예약된 시간보다 더 좋은지 확인"""
-        if self.current_reservation is None:
-            return True
-            
-        # 예: 더 이른 시간을 선호하는 경우
-        return new_time < self.current_reservation
+        """새로운 시간이 현재 예약된 시간보다 더 좋은지 확인 (점수가 같으면 이른 시간)"""
+        return self.slot_preferences().is_better(new_time, self.current_reservation)
 
     def cancel_current_reservation(self):
         """현재 예약 취소"""
         try:
             # 예약 취소 버튼 찾아 클릭
+            modal_region = self.calculate_modal_region()
+            reference = self.watcher.snapshot(modal_region)
             if self.click_text(self.app_region, "예약취소"):
-                time.sleep(1)
-                # 확인 모달에서 확인 버튼 클릭
-                modal_region = self.calculate_modal_region()
-                if self.click_text(modal_region, "확인"):
+                # 확인 모달이 뜨면 바로 확인 버튼 클릭
+                location = self.wait_for_text(modal_region, "확인", timeout=2, reference=reference)
+                reference = self.watcher.snapshot(self.app_region)
+                if location is not None and self.click_at(location, "확인"):
                     logging.info("기존 예약 취소 완료")
                     self.current_reservation = None
-                    time.sleep(2)  # 취소 처리 대기
+                    with self.metrics.stage('wait'):
+                        self.watcher.wait_for_update(self.app_region, reference, timeout=4)  # 취소 처리 대기
                     return True
             return False
         except Exception as e:
             logging.error(f"예약 취소 실패: {str(e)}")
             return False
 
+    def parse_available_times(self, ocr, screenshot=None):
+        """OCR 결과에서 목표 범위 안의 예약 가능 시간을 시간순으로 추출"""
+        preferences = self.slot_preferences()
+        return [slot for slot in self.parse_slots(ocr, screenshot)
+                if preferences.score(slot.time) is not None]
+
+    def parse_slots(self, ocr, screenshot=None, origin=None, engine=None):
+        """OCR 단어 박스에서 예약 가능한 모든 시간대를 Slot 목록으로 추출 (시간순)
+
+        좌표는 origin(기본: 앱 영역 왼쪽 위) 기준 화면 좌표이므로 다시 OCR하지 않고
+        바로 클릭할 수 있습니다. 시간을 읽지 못한 칸은 screenshot이 있으면 해당 시간 칸만
+        숫자 전용 프로필로 다시 읽습니다 (engine: 재인식에 쓸 OCR 엔진, 기본 self.ocr).
+        """
+        if origin is None:
+            origin = self.app_region[:2]
+        reread = None
+        if screenshot is not None:
+            reread = lambda boxes: self.reread_time(screenshot, boxes, engine=engine)
+        date = datetime.now() + timedelta(days=self.booking_days_ahead)
+        return extract_slots(zip(ocr.words, ocr.boxes, ocr.confidences), origin=origin,
+                             reread=reread, date=date)
+
+    def reread_time(self, screenshot, boxes, padding=4, engine=None):
+        """시간 칸 박스들만 잘라 숫자 전용 프로필로 다시 OCR"""
+        x0 = max(0, min(x for x, _, _, _ in boxes) - padding)
+        y0 = max(0, min(y for _, y, _, _ in boxes) - padding)
+        x1 = max(x + w for x, _, w, _ in boxes) + padding
+        y1 = max(y + h for _, y, _, h in boxes) + padding
+        try:
+            profile = ocr_engine.get_profile(self.time_profile)
+            with self.metrics.stage('ocr'):
+                text = profile.image_to_string(screenshot[y0:y1, x0:x1], engine=engine or self.ocr)
+            return parse_time_text(text)
+        except Exception as e:
+            logging.error(f"시간 재인식 실패: {str(e)}")
+            return None
+
+    def ocr_slots(self, screenshot, engine=None):
+        """시간대 목록 영역만 OCR하고 좌표는 스크린샷(앱 영역) 기준으로 되돌림 (engine 기본 self.ocr)"""
+        area = screenshot
+        if self.slot_area is not None:
+            x0, y0, x1, y1 = self.slot_area
+            area = screenshot[y0:y1, x0:x1]
+        with self.metrics.stage('ocr'):
+            ocr = OcrResult.from_image(area, profile=self.slot_profile, engine=engine or self.ocr)
+        if self.slot_area is not None:
+            ocr.shift(self.slot_area[0], self.slot_area[1])
+        return ocr
+
+    def read_slots(self):
+        """시간대 목록을 읽어 (OcrResult, 예약 가능 시간 목록) 반환
+
+        새로고침 후 화면의 지각 해시가 지난번과 같으면 이전 결과를 재사용합니다.
+        """
+        screenshot = self.capture_screen(self.app_region)
+        if screenshot is None:
+            return None
+        
+        area = screenshot
+        if self.slot_area is not None:
+            x0, y0, x1, y1 = self.slot_area
+            area = screenshot[y0:y1, x0:x1]
+        hash_size = (max(1, int(area.shape[1] * self.slot_hash_scale)),
+                     max(1, int(area.shape[0] * self.slot_hash_scale)))
+        with self.metrics.stage('preprocess'):
+            slot_hash = dhash(area, hash_size, margin=self.slot_hash_margin)
+        
+        if self.slot_cache is not None:
+            cached_region, cached_hash, ocr, available_times = self.slot_cache
+            if (cached_region == self.app_region
+                    and hamming(slot_hash, cached_hash) <= self.slot_hash_threshold):
+                self.ocr_skipped += 1
+                logging.info(f"화면 변화 없음 - 이전 OCR 결과 재사용 "
+                             f"(OCR 수행 {self.ocr_passes}회 / 생략 {self.ocr_skipped}회)")
+                return ocr, available_times
+        
+        try:
+            ocr = self.ocr_slots(screenshot)
+        except Exception as e:
+            logging.error(f"OCR 실패: {str(e)}")
+            return None
+        self.ocr_passes += 1
+        
+        with self.metrics.stage('parse'):
+            available_times = self.parse_available_times(ocr, screenshot)
+        self.slot_cache = (self.app_region, slot_hash, ocr, available_times)
+        return ocr, available_times
+
+    def book_slot(self, slot):
+        """기존 예약이 있으면 취소하고 slot을 예약"""
+        logging.info(f"더 좋은 예약 가능 시간대 발견: {slot.time_str}")
+        # 예약/취소로 화면이 바뀌므로 다음 확인 때는 다시 OCR
+        self.slot_cache = None
+        location = slot.location
+        
+        # 기존 예약이 있다면 취소
+        if self.current_reservation is not None:
+            if not self.cancel_current_reservation():
+                return False
+            # 취소 후에는 화면이 바뀌었을 수 있으므로 다시 찾음
+            location = None
+        
+        # 새로운 예약 시도
+        modal_region = self.calculate_modal_region()
+        reference = self.watcher.snapshot(modal_region)
+        if location is not None:
+            clicked = self.click_at(location, slot.time_str)
+        else:
+            clicked = self.click_text(self.app_region, slot.time_str)
+        if clicked:
+            # 확인 모달이 뜨면 바로 확인 버튼 클릭
+            location = self.wait_for_text(modal_region, "확인", timeout=4, reference=reference)
+            if location is not None and self.click_at(location, "확인"):
+                logging.info(f"새로운 예약 완료: {slot.time_str}")
+                self.current_reservation = slot.time
+                return True
+        return False
+
+    def book_best(self, available_times):
+        """지난 확인 이후 새로 생긴 시간대 중 현재 예약보다 좋은 시간대를 순서대로 예약 시도"""
+        # 지난 확인 이후 새로 생긴 시간대만 우선순위 큐에 들어감
+        if self.slot_decider is None:
+            self.slot_decider = SlotDecider(self.slot_preferences())
+        added, removed = self.slot_decider.update(available_times)
+        if added or removed:
+            logging.info(f"시간대 변화: 추가 {[slot.time_str for slot in added]}, "
+                         f"삭제 {[slot.time_str for slot in removed]}")
+        
+        # 시도한 시간대는 다음 확인 때 다시 후보가 됨 (예약에 성공한 시간대는 현재 예약보다
+        # 좋지 않으므로 다시 선택되지 않고, 이미 사라진 시간대는 큐에서 버려짐)
+        attempted = []
+        try:
+            while True:
+                # 현재 예약이 없거나, 더 좋은 시간대인 경우
+                slot = self.slot_decider.pop_better(self.current_reservation)
+                if slot is None:
+                    break
+                attempted.append(slot)
+                if self.book_slot(slot):
+                    return True
+        finally:
+            for slot in attempted:
+                self.slot_decider.requeue(slot)
+        
+        logging.info("더 좋은 예약 가능 시간대가 없습니다.")
+        return False
+
     def check_reservation(self):
         """예약 가능 시간대 확인 및 예약 시도"""
         if self.app_region is None:
@@ -215,51 +531,12 @@ class GolfReservation:
                 return False
 
         try:
-            screenshot = self.capture_screen(self.app_region)
-            if screenshot is None:
+            # 한 번의 OCR 결과로 시간대 파싱과 클릭 좌표를 모두 처리
+            slots = self.read_slots()
+            if slots is None:
                 return False
-
-            text = self.extract_text_from_image(screenshot)
-            now = datetime.now()
-            
-            available_times = []
-            for line in text.splitlines():
-                if "예약" in line:
-                    try:
-                        time_str = line.split("예약")[0].strip()
-                        reservation_time = datetime.strptime(time_str, "%H:%M").replace(
-                            year=now.year, month=now.month, day=now.day)
-                        
-                        if self.is_time_in_range(reservation_time):
-                            available_times.append((reservation_time, time_str))
-                    except ValueError:
-                        continue
-            
-            # 가능한 시간들을 시간순으로 정렬
-            available_times.sort()
-            
-            for reservation_time, time_str in available_times:
-                # 현재 예약이 없거나, 더 좋은 시간대인 경우
-                if self.is_better_time(reservation_time):
-                    logging.info(f"더 좋은 예약 가능 시간대 발견: {time_str}")
-                    
-                    # 기존 예약이 있다면 취소
-                    if self.current_reservation is not None:
-                        if not self.cancel_current_reservation():
-                            continue
-                    
-                    # 새로운 예약 시도
-                    if self.click_text(self.app_region, time_str):
-                        time.sleep(2)
-                        
-                        modal_region = self.calculate_modal_region()
-                        if self.click_text(modal_region, "확인"):
-                            logging.info(f"새로운 예약 완료: {time_str}")
-                            self.current_reservation = reservation_time
-                            return True
-            
-            logging.info("더 좋은 예약 가능 시간대가 없습니다.")
-            return False
+            _, available_times = slots
+            return self.book_best(available_times)
             
         except Exception as e:
             logging.error(f"예약 확인 중 오류 발생: {str(e)}")
@@ -273,8 +550,59 @@ class GolfReservation:
         modal_h = (self.app_region[3] - self.app_region[1])//2
         return (modal_x, modal_y, modal_x + modal_w, modal_y + modal_h)
 
+    def build_scheduler(self):
+        """목표 시간대와 예약 오픈 시각 근처에서 자주 확인하는 스케줄러 생성"""
+        scheduler = AdaptiveScheduler(default_interval=self.idle_interval)
+        
+        # 목표 시간대 시작 전부터 종료 시까지 빠르게 확인 (취소 자리가 주로 나오는 시간)
+        active_start = datetime(2000, 1, 1, self.target_start_time % 24) - timedelta(minutes=self.active_lead_minutes)
+        scheduler.add_window(active_start.time(), (self.target_end_time + 1) % 24, self.active_interval)
+        
+        # 예약 오픈 시각 전후
+        before, after = self.release_window_minutes
+        for release in self.release_times:
+            release_at = datetime.combine(datetime.now().date(), parse_time(release))
+            scheduler.add_window((release_at - timedelta(minutes=before)).time(),
+                                 (release_at + timedelta(minutes=after)).time(),
+                                 self.active_interval)
+        return scheduler
+
     def job(self):
-        """주기적으로 실행할 작업"""
+        """주기적으로 실행할 작업 (한 번의 확인 주기 전체 시간을 'cycle'로 기록)"""
+        try:
+            with self.metrics.stage('cycle'):
+                return self.check_cycle()
+        finally:
+            self.anchors.flush()
+            self.metrics.maybe_flush()
+
+    def upcoming_release(self, now=None):
+        """집중 모드로 확인할 오픈 시각 (준비 시간 안에 있거나 막 지난 경우, 없으면 None)"""
+        if not self.release_sniper:
+            return None
+        now = now or datetime.now()
+        for release in self.release_times:
+            release_at = datetime.combine(now.date(), parse_time(release))
+            if release_at + timedelta(seconds=self.sniper_window_seconds) < now:
+                release_at += timedelta(days=1)
+            seconds = (release_at - now).total_seconds()
+            if (-self.sniper_window_seconds < seconds <= self.sniper_lead_seconds
+                    and release_at not in self.sniped_releases):
+                return release_at
+        return None
+
+    def snipe(self, release_at):
+        """오픈 시각 집중 모드 실행 (예약에 성공하면 True)"""
+        self.sniped_releases.add(release_at)
+        sniper = ReleaseSniper(self, release_at, window=self.sniper_window_seconds,
+                               interval=self.sniper_interval)
+        return sniper.run()
+
+    def check_cycle(self):
+        release_at = self.upcoming_release()
+        if release_at is not None:
+            return self.snipe(release_at)
+        
         # 줄서기 탭 선택
         if not self.select_queue_tab():
             return False
@@ -286,32 +614,47 @@ class GolfReservation:
         return self.check_reservation()
 
     def run(self):
-        """메인 실행 함수"""
+        """메인 실행 함수 (오류로 끝나면 last_error에 기록)"""
+        self.last_error = None
+        if self.profiler is not None:
+            self.profiler.start()
         try:
-            logging.info("앱 영역 자동 감지를 시작합니다...")
-            self.app_region = self.find_app_region()
+            # Tesseract 언어 모델 미리 로드
+            if ocr_engine.get_engine().warm_up():
+                logging.info("Tesseract API 엔진 준비 완료")
+            # 다시 실행될 때는 이전에 만든 작업 프로세스 풀을 그대로 사용
+            if self.ocr_workers > 0 and not isinstance(self.ocr, ocr_engine.TiledOcr):
+                self.ocr = ocr_engine.TiledOcr(workers=self.ocr_workers)
+                logging.info(f"병렬 OCR 사용: 작업 프로세스 {self.ocr_workers}개")
             
+            # 이전 실행에서 감지했거나 설정으로 지정한 영역이 있으면 감지 생략
             if self.app_region is None:
-                logging.error("앱 영역을 찾을 수 없습니다.")
-                return
-            
-            logging.info(f"감지된 앱 영역: {self.app_region}")
-            
-            # 스케줄러 설정
-            schedule.every(5).minutes.do(self.job)
+                logging.info("앱 영역 자동 감지를 시작합니다...")
+                self.app_region = self.find_app_region()
+                
+                if self.app_region is None:
+                    logging.error("앱 영역을 찾을 수 없습니다.")
+                    return
             
-            # 첫 실행
-            self.job()
+            logging.info(f"앱 영역: {self.app_region}")
             
-            # 메인 루프 - 예약 성공 후에도 계속 실행
-            while True:
-                schedule.run_pending()
-                time.sleep(1)
+            # 스케줄러 설정 - 첫 실행 후 다음 확인 시각까지 대기
+            # 예약 성공 후에도 더 좋은 시간대를 찾기 위해 계속 실행
+            self.scheduler = self.build_scheduler()
+            logging.info(f"확인 주기: 기본 {self.idle_interval}초, 집중 구간 {self.scheduler.windows}")
+            self.scheduler.run(self.job)
                 
         except KeyboardInterrupt:
             logging.info("프로그램이 사용자에 의해 종료되었습니다.")
         except Exception as e:
             logging.error(f"프로그램 실행 중 오류 발생: {str(e)}")
+            self.last_error = e
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+            self.anchors.flush()
+            self.metrics.log_summary()
+            self.metrics.close()
 
 if __name__ == "__main__":
     # Tesseract 경로 설정 (Windows의 경우)
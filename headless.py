@@ -0,0 +1,122 @@
+"""Tk 창 없이 설정 파일만으로 예약/낚시 봇을 실행하는 진입점
+
+사용법:
+    python headless.py golf golf.json
+    python headless.py schedules schedules.json
+    python headless.py fishing fishing.json
+
+설정 파일(JSON)의 키는 같은 이름의 속성에 그대로 적용됩니다. 예:
+    golf:      {"window": [0, 0, 540, 960], "target_start_time": 20, "release_times": ["09:00"],
+                "release_sniper": true}
+    schedules: {"app_region": [0, 0, 540, 960]}
+    fishing:   {"regions": [[0, 0, 400, 400]], "bite_threshold": 0.5}
+               창이 여러 개면 영역마다 키 입력 전에 클릭할 좌표를 지정할 수 있습니다
+               (기본 영역 중심): {"regions": [{"region": [0, 0, 400, 400], "focus_point": [200, 10]},
+                                              [420, 0, 400, 400]]}
+
+공통 키:
+    restart        오류로 끝나면 같은 프로세스에서 바로 다시 실행 (기본 true)
+    restart_delay  다시 실행하기 전 대기 시간 (초, 기본 1.0, 연속 실패 시 최대 60초까지 증가)
+    tesseract_cmd  Tesseract 실행 파일 경로
+
+다시 실행할 때는 같은 봇 객체를 재사용하므로 모듈 import, OCR 엔진, 템플릿,
+감지한 앱 영역과 현재 예약 상태가 그대로 유지됩니다.
+"""
+import os
+import sys
+import json
+import time
+import types
+import logging
+import importlib.util
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REGION_KEYS = ('window', 'app_region', 'slot_area', 'region')
+
+def apply_settings(target, settings, name='설정'):
+    """설정 항목을 같은 이름의 속성에 적용 (영역 좌표 목록은 튜플로 변환)"""
+    for key, value in settings.items():
+        if not hasattr(target, key):
+            raise ValueError(f"알 수 없는 {name} 항목: {key}")
+        if key in REGION_KEYS and value is not None:
+            value = tuple(value)
+        setattr(target, key, value)
+
+def load_fishing_module():
+    """fishing-ark.py는 이름에 '-'가 있어 파일 경로로 로드"""
+    spec = importlib.util.spec_from_file_location('fishing_ark', os.path.join(BASE_DIR, 'fishing-ark.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def create_bot(target, settings):
+    """대상 봇 생성 - (봇, 실행 함수) 반환. 필요한 모듈만 import합니다."""
+    settings = dict(settings)
+    if target == 'golf':
+        from golf_reservation import GolfReservation
+        bot = GolfReservation()
+        run = bot.run
+    elif target == 'schedules':
+        from schedules import GolfReservation
+        bot = GolfReservation()
+        run = bot.run
+    elif target == 'fishing':
+        module = load_fishing_module()
+        bot = module.FishingBot(ui=False, regions=settings.pop('regions', None))
+        run = bot.run_headless
+    else:
+        raise ValueError(f"알 수 없는 실행 대상: {target} (golf, schedules, fishing)")
+    apply_settings(bot, settings)
+    return bot, run
+
+def supervise(bot, run, restart=True, restart_delay=1.0, max_delay=60.0, stable_after=30.0):
+    """run이 오류로 끝나면(bot.last_error) 같은 객체로 다시 실행
+
+    stable_after초 안에 다시 실패하면 대기 시간을 두 배로 늘려 재시작 폭주를 막습니다.
+    """
+    delay = restart_delay
+    while True:
+        started = time.monotonic()
+        run()
+        if bot.last_error is None or not restart:
+            return
+        if time.monotonic() - started >= stable_after:
+            delay = restart_delay
+        logging.warning(f"오류로 종료되어 {delay:.1f}초 후 다시 시작합니다: {bot.last_error}")
+        time.sleep(delay)
+        delay = min(max_delay, delay * 2)
+
+def main(argv):
+    if len(argv) != 3:
+        print("사용법: python headless.py (golf|schedules|fishing) config.json")
+        return 1
+    target, path = argv[1], argv[2]
+    with open(path, encoding='utf-8') as f:
+        settings = json.load(f)
+
+    restart = settings.pop('restart', True)
+    restart_delay = settings.pop('restart_delay', 1.0)
+    tesseract_cmd = settings.pop('tesseract_cmd', None)
+    if tesseract_cmd is None and os.name == 'nt':  # Windows
+        tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+    if tesseract_cmd and target != 'fishing':
+        import ocr_engine
+        ocr_engine.pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    if target == 'fishing':
+        # 예약 스크립트는 import 시 자체 로그 설정(reservation.log)을 사용
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    bot, run = create_bot(target, settings)
+    try:
+        supervise(bot, run, restart=restart, restart_delay=restart_delay)
+    except KeyboardInterrupt:
+        logging.info("프로그램이 사용자에 의해 종료되었습니다.")
+    finally:
+        # 재시작 동안 유지한 병렬 OCR 작업 프로세스 정리
+        ocr = getattr(bot, 'ocr', None)
+        if ocr is not None and not isinstance(ocr, types.ModuleType):
+            ocr.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
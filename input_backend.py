@@ -0,0 +1,144 @@
+import os
+import time
+import random
+from lazy_import import lazy_import
+
+pyautogui = lazy_import('pyautogui')
+keyboard = lazy_import('keyboard', optional=True)  # 게임 창에도 전달되는 저수준 키 입력
+
+class InputBackend:
+    """마우스/키보드 입력 공통 인터페이스 (좌표는 화면 좌표)"""
+
+    def click(self, x, y):
+        raise NotImplementedError
+
+    def move_to(self, x, y, duration=0.0):
+        raise NotImplementedError
+
+    def mouse_down(self):
+        raise NotImplementedError
+
+    def mouse_up(self):
+        raise NotImplementedError
+
+    def press(self, key):
+        """키 한 번 누르고 떼기"""
+        raise NotImplementedError
+
+    def hotkey(self, *keys):
+        raise NotImplementedError
+
+    def drag(self, start, end, duration):
+        """start에서 눌러 end까지 duration초 동안 끌고 놓기"""
+        self.move_to(*start)
+        self.mouse_down()
+        self.move_to(*end, duration=duration)
+        self.mouse_up()
+
+class SystemInput(InputBackend):
+    """실제 입력 (마우스: pyautogui, 키: pyautogui 또는 keyboard)
+
+    pyautogui는 호출마다 PAUSE(기본 0.1초)만큼 쉬지만 여기서는 그 대기를 끄고,
+    필요하면 delay 범위의 무작위 대기와 jitter 픽셀 이내의 좌표 흔들림을 직접 넣습니다.
+    pause=True면 pyautogui 기본 대기를 그대로 사용합니다 (기존 동작).
+    """
+
+    def __init__(self, keys='pyautogui', delay=(0.0, 0.0), jitter=0, min_drag=0.0, pause=False):
+        if keys == 'keyboard' and keyboard is None:
+            keys = 'pyautogui'
+        self.keys = keys
+        self.delay = delay          # 동작 후 무작위 대기 범위 (초)
+        self.jitter = jitter        # 클릭 좌표 흔들림 (픽셀)
+        self.min_drag = min_drag    # 최소 드래그 시간 (초)
+        self.pause = pause
+
+    def _wait(self):
+        low, high = self.delay
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+    def _point(self, x, y):
+        if self.jitter:
+            x += random.randint(-self.jitter, self.jitter)
+            y += random.randint(-self.jitter, self.jitter)
+        return x, y
+
+    def click(self, x, y):
+        pyautogui.click(*self._point(x, y), _pause=self.pause)
+        self._wait()
+
+    def move_to(self, x, y, duration=0.0):
+        pyautogui.moveTo(x, y, duration=duration, _pause=self.pause)
+
+    def mouse_down(self):
+        pyautogui.mouseDown(_pause=self.pause)
+
+    def mouse_up(self):
+        pyautogui.mouseUp(_pause=self.pause)
+        self._wait()
+
+    def press(self, key):
+        if self.keys == 'keyboard':
+            keyboard.press_and_release(key)
+        else:
+            pyautogui.press(key, _pause=self.pause)
+        self._wait()
+
+    def hotkey(self, *keys):
+        if self.keys == 'keyboard':
+            keyboard.press_and_release('+'.join(keys))
+        else:
+            pyautogui.hotkey(*keys, _pause=self.pause)
+        self._wait()
+
+    def drag(self, start, end, duration):
+        super().drag(start, end, max(duration, self.min_drag))
+
+class RecordingInput(InputBackend):
+    """입력을 보내지 않고 (시각, 동작, 인자)만 기록 (테스트/벤치마크/재생용)"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.events = []
+
+    def _record(self, action, *args):
+        self.events.append((self.clock(), action, args))
+
+    def click(self, x, y):
+        self._record('click', x, y)
+
+    def move_to(self, x, y, duration=0.0):
+        self._record('move_to', x, y, duration)
+
+    def mouse_down(self):
+        self._record('mouse_down')
+
+    def mouse_up(self):
+        self._record('mouse_up')
+
+    def press(self, key):
+        self._record('press', key)
+
+    def hotkey(self, *keys):
+        self._record('hotkey', *keys)
+
+def create_input(name=None, keys='pyautogui'):
+    """입력 백엔드 생성
+
+    name이 없으면 환경변수 INPUT_BACKEND를 따르고, 그것도 없으면 'fast'입니다.
+        fast       대기 없이 바로 입력
+        human      동작마다 50~150ms 무작위 대기, 좌표 2픽셀 흔들림, 드래그 최소 0.3초
+        pyautogui  pyautogui 기본 PAUSE(0.1초) 유지 (기존 동작)
+        record     실제 입력 없이 기록만
+    keys는 키 입력에 사용할 라이브러리입니다 ('pyautogui' 또는 'keyboard').
+    """
+    name = name or os.environ.get('INPUT_BACKEND', 'fast')
+    if name == 'fast':
+        return SystemInput(keys=keys)
+    if name == 'human':
+        return SystemInput(keys=keys, delay=(0.05, 0.15), jitter=2, min_drag=0.3)
+    if name == 'pyautogui':
+        return SystemInput(keys=keys, pause=True)
+    if name == 'record':
+        return RecordingInput()
+    raise ValueError(f"알 수 없는 입력 백엔드: {name}")
@@ -0,0 +1,54 @@
+import sys
+import importlib
+import importlib.util
+
+class LazyModule:
+    """처음 속성에 접근할 때 실제 모듈을 import하는 대리 객체"""
+
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, '_module', module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+class MissingModule:
+    """설치되지 않은 필수 모듈 자리 - 실제로 사용할 때 ImportError 발생"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        raise ImportError(f"{self.name}가 설치되어 있지 않습니다 (pip install {self.name.split('.')[0]})")
+
+def lazy_import(name, optional=False):
+    """처음 속성에 접근할 때 import되는 모듈 반환
+
+    시작 시간을 줄이기 위해 무거운 의존성(pytesseract, pyautogui, tkinter 등)에 사용합니다.
+    설치되지 않은 모듈은 optional이면 None(기존 try/except ImportError와 같음),
+    아니면 사용할 때 ImportError를 내는 MissingModule을 반환합니다.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    # 최상위 패키지만 찾아서 확인 (아무것도 import하지 않음)
+    try:
+        spec = importlib.util.find_spec(name.split('.')[0])
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None:
+        return None if optional else MissingModule(name)
+    return LazyModule(name)
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import bisect
+import random
+import logging
+import threading
+import cProfile
+import pstats
+from collections import Counter
+from contextlib import contextmanager
+
+# 히스토그램 버킷 경계 (초) - 캡처(수 ms)부터 OCR/대기(수 초)까지
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+class LatencyHistogram:
+    """단계 하나의 소요 시간 분포 (Prometheus 누적 버킷 + 백분위수용 표본)
+
+    표본은 저수지 샘플링으로 sample_size개만 보관하므로 오래 실행해도 메모리가 일정합니다.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, sample_size=2048):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.sample_size = sample_size
+        self.samples = []
+
+    def observe(self, seconds):
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < self.sample_size:
+            self.samples.append(seconds)
+        else:
+            index = random.randrange(self.count)
+            if index < self.sample_size:
+                self.samples[index] = seconds
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self):
+        result = {'count': self.count, 'sum': self.sum, 'max': self.max,
+                  'mean': self.sum / self.count if self.count else 0.0}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = self.percentile(q)
+        return result
+
+class StageMetrics:
+    """단계별(캡처, 전처리, OCR, 매칭, 파싱, 입력, 대기 등) 소요 시간 수집기
+
+    textfile이 주어지면 flush_interval마다 Prometheus 텍스트 형식으로 기록하고
+    (node_exporter textfile collector용), close() 때 summary_path에 JSON 요약을 저장합니다.
+    """
+
+    def __init__(self, prefix, textfile=None, summary_path=None, flush_interval=30):
+        self.prefix = prefix
+        self.textfile = textfile
+        self.summary_path = summary_path
+        self.flush_interval = flush_interval
+        self.histograms = {}
+        self.counters = {}          # 누적 횟수 (예: 버린 프레임 수)
+        self.started = time.time()
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, prefix):
+        """환경 변수 METRICS_TEXTFILE, METRICS_SUMMARY, METRICS_INTERVAL로 생성"""
+        return cls(prefix,
+                   textfile=os.environ.get('METRICS_TEXTFILE') or None,
+                   summary_path=os.environ.get('METRICS_SUMMARY') or None,
+                   flush_interval=float(os.environ.get('METRICS_INTERVAL', 30)))
+
+    @contextmanager
+    def stage(self, name):
+        """with 블록의 소요 시간을 name 단계로 기록 (예외가 나도 기록)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        """단계별 {count, sum, max, mean, p50, p95, p99}"""
+        with self.lock:
+            return {name: h.summary() for name, h in sorted(self.histograms.items())}
+
+    def render_prometheus(self):
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Time spent in each stage of the {self.prefix} loop.",
+                 f"# TYPE {name} histogram"]
+        quantile_lines = []
+        with self.lock:
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                bounds = [str(b) for b in h.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, h.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+                for q in QUANTILES:
+                    quantile_lines.append(f'{name}_quantile{{stage="{stage}",quantile="{q}"}} '
+                                          f'{h.percentile(q):.6f}')
+        lines.append(f"# HELP {name}_quantile Sampled latency quantiles per stage.")
+        lines.append(f"# TYPE {name}_quantile gauge")
+        lines.extend(quantile_lines)
+        with self.lock:
+            counters = sorted(self.counters.items())
+        if counters:
+            lines.append(f"# TYPE {self.prefix}_events_total counter")
+            for event, value in counters:
+                lines.append(f'{self.prefix}_events_total{{event="{event}"}} {value}')
+        lines.append(f"# TYPE {self.prefix}_metrics_updated_seconds gauge")
+        lines.append(f"{self.prefix}_metrics_updated_seconds {time.time():.0f}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path=None):
+        """Prometheus 텍스트 파일 기록 (수집기가 중간 상태를 읽지 않도록 교체 방식)"""
+        path = path or self.textfile
+        if not path:
+            return
+        try:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.error(f"지표 파일 기록 실패: {str(e)}")
+
+    def maybe_flush(self):
+        """마지막 기록 후 flush_interval이 지났으면 텍스트 파일 기록"""
+        if self.textfile and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.last_flush = time.monotonic()
+            self.write_textfile()
+
+    def write_summary(self, path=None):
+        path = path or self.summary_path
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                with self.lock:
+                    counters = dict(self.counters)
+                json.dump({'prefix': self.prefix, 'started': self.started,
+                           'finished': time.time(), 'stages': self.summary(),
+                           'events': counters}, f, indent=2)
+        except Exception as e:
+            logging.error(f"지표 요약 저장 실패: {str(e)}")
+
+    def summary_lines(self):
+        """사람이 읽을 단계별 요약 문자열 목록"""
+        return [f"[{name}] {s['count']}회, p50 {s['p50'] * 1000:.1f}ms, "
+                f"p95 {s['p95'] * 1000:.1f}ms, p99 {s['p99'] * 1000:.1f}ms"
+                for name, s in self.summary().items()]
+
+    def log_summary(self):
+        for line in self.summary_lines():
+            logging.info(line)
+
+    def close(self):
+        """종료 시 마지막 텍스트 파일과 JSON 요약 저장"""
+        self.write_textfile()
+        self.write_summary()
+
+class SamplingProfiler:
+    """대상 스레드의 호출 스택을 주기적으로 샘플링 (실행 속도에 거의 영향 없음)
+
+    결과는 flamegraph.pl / speedscope에서 읽을 수 있는 collapsed stack 형식입니다.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id  # None이면 enable()을 호출한 스레드
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enable(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump_stats(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Profiler:
+    """선택적 프로파일러 - mode는 'cprofile'(함수별 누적 시간) 또는 'sample'(스택 샘플링)
+
+    두 방식 모두 start()를 호출한 스레드만 측정합니다.
+    """
+
+    def __init__(self, mode, path):
+        self.mode = mode
+        self.path = path
+        self.profiler = SamplingProfiler() if mode == 'sample' else cProfile.Profile()
+
+    @classmethod
+    def from_env(cls, name):
+        """환경 변수 PROFILE(cprofile / sample)이 설정된 경우에만 생성 (없으면 None)"""
+        mode = os.environ.get('PROFILE', '').lower()
+        if mode not in ('cprofile', 'sample'):
+            return None
+        ext = 'txt' if mode == 'sample' else 'prof'
+        return cls(mode, os.environ.get('PROFILE_OUTPUT') or f"{name}.{ext}")
+
+    def start(self):
+        self.profiler.enable()
+        logging.info(f"프로파일링 시작 ({self.mode}) - 결과: {self.path}")
+
+    def stop(self):
+        self.profiler.disable()
+        try:
+            self.profiler.dump_stats(self.path)
+            if self.mode == 'cprofile':
+                pstats.Stats(self.path).sort_stats('cumulative').print_stats(20)
+        except Exception as e:
+            logging.error(f"프로파일 저장 실패: {str(e)}")
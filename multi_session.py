@@ -0,0 +1,140 @@
+"""여러 앱플레이어 창의 예약 세션을 한 프로세스에서 동시에 실행
+
+사용법: python multi_session.py sessions.json
+
+sessions.json 예시:
+    {
+        "ocr_workers": 0,
+        "sessions": [
+            {"name": "account1", "window": [0, 0, 540, 960], "target_start_time": 20},
+            {"name": "account2", "window": [540, 0, 1080, 960], "release_times": ["09:00"]}
+        ]
+    }
+
+세션 설정의 나머지 키는 같은 이름의 GolfReservation 속성에 그대로 적용됩니다.
+각 세션의 작업은 공유 스레드 풀에서 실행되며 (OCR은 GIL 밖에서 동작),
+OCR 엔진 풀과 마우스 입력 잠금은 모든 세션이 공유합니다.
+"""
+import os
+import sys
+import json
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import ocr_engine
+from golf_reservation import GolfReservation
+from screen_capture import create_backend
+from metrics import StageMetrics
+from headless import apply_settings
+
+def create_session(config, capture, ocr, input_lock, metrics):
+    """설정 한 항목으로 공유 자원을 사용하는 GolfReservation 생성"""
+    config = dict(config)
+    name = config.pop('name')
+    if 'ocr_workers' in config:
+        raise ValueError(f"세션 설정({name})에는 ocr_workers를 지정할 수 없습니다 "
+                         f"(OCR 풀은 모든 세션이 공유 - 최상위 ocr_workers 사용)")
+    # 창마다 버튼 위치가 다르므로 캐시 파일도 세션별로 사용, 프로파일링은 러너 단위
+    session = GolfReservation(name=name, capture=capture, ocr=ocr, input_lock=input_lock,
+                              metrics=metrics, anchor_path=f'.anchor_cache_{name}.npz',
+                              profile=False)
+
+    apply_settings(session, config, name=f"세션 설정({name})")
+    return session
+
+class MultiSessionRunner:
+    """세션마다 자체 스케줄(AdaptiveScheduler)에 따라 job을 실행하는 asyncio 러너"""
+
+    def __init__(self, configs, ocr_workers=0):
+        self.capture = create_backend()
+        self.input_lock = threading.Lock()
+        self.metrics = StageMetrics.from_env('golf_reservation')
+
+        # 세션 수만큼 Tesseract 인스턴스를 두어 동시에 OCR
+        if ocr_workers > 0:
+            self.ocr = ocr_engine.TiledOcr(workers=ocr_workers)
+        else:
+            self.ocr = ocr_engine.OcrEnginePool(size=len(configs))
+
+        self.sessions = [create_session(config, self.capture, self.ocr, self.input_lock, self.metrics)
+                         for config in configs]
+        self.executor = ThreadPoolExecutor(max_workers=len(self.sessions),
+                                           thread_name_prefix='session')
+        self._stop = None
+
+    async def run_session(self, session):
+        loop = asyncio.get_running_loop()
+        scheduler = session.build_scheduler()
+        logging.info(f"[{session.name}] 확인 주기: 기본 {session.idle_interval}초, "
+                     f"집중 구간 {scheduler.windows}")
+
+        next_time = datetime.now()
+        while not self._stop.is_set():
+            delay = (next_time - datetime.now()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+
+            started = datetime.now()
+            try:
+                if session.app_region is None:
+                    session.app_region = await loop.run_in_executor(self.executor, session.find_app_region)
+                    if session.app_region is None:
+                        logging.error(f"[{session.name}] 앱 영역을 찾을 수 없습니다.")
+                if session.app_region is not None:
+                    await loop.run_in_executor(self.executor, session.job)
+            except Exception as e:
+                logging.error(f"[{session.name}] 세션 실행 중 오류 발생: {str(e)}")
+
+            next_time = scheduler.next_run(started)
+
+    async def run_async(self):
+        self._stop = asyncio.Event()
+        await asyncio.gather(*(self.run_session(session) for session in self.sessions))
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    def run(self):
+        # Tesseract 언어 모델 미리 로드 (나머지 인스턴스는 필요할 때 생성)
+        if isinstance(self.ocr, ocr_engine.OcrEnginePool) and self.ocr.warm_up():
+            logging.info("Tesseract API 엔진 준비 완료")
+        logging.info(f"세션 {len(self.sessions)}개 실행: "
+                     f"{', '.join(session.name for session in self.sessions)}")
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            logging.info("프로그램이 사용자에 의해 종료되었습니다.")
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            for session in self.sessions:
+                session.anchors.flush()
+            self.metrics.log_summary()
+            self.metrics.close()
+
+def load_config(path):
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    names = [session['name'] for session in config['sessions']]
+    if len(set(names)) != len(names):
+        raise ValueError("세션 이름이 중복되었습니다.")
+    return config
+
+if __name__ == "__main__":
+    # Tesseract 경로 설정 (Windows의 경우)
+    if os.name == 'nt':  # Windows
+        ocr_engine.pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+    if len(sys.argv) != 2:
+        print("사용법: python multi_session.py sessions.json")
+        sys.exit(1)
+
+    config = load_config(sys.argv[1])
+    runner = MultiSessionRunner(config['sessions'], ocr_workers=config.get('ocr_workers', 0))
+    runner.run()
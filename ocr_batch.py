@@ -0,0 +1,198 @@
+"""저장해 둔 예약 화면 스크린샷을 화면 없이 일괄 OCR/파싱
+
+check_reservation과 같은 경로(시간대 영역 OCR -> 시간 파싱 -> 시간 칸 재인식)로
+이미지마다 예약 가능 시간대를 추출합니다. 파서 변경 시 회귀 확인과 OCR 처리량 측정용입니다.
+
+사용법:
+    python ocr_batch.py screenshots/ --workers 4
+    python ocr_batch.py archive.tar.gz --output slots.jsonl
+    python ocr_batch.py screenshots/ --expected slots.jsonl   # 이전 결과와 비교
+
+스크린샷은 앱 영역만 캡처한 이미지여야 합니다 (slot_area 등 좌표가 앱 영역 기준).
+"""
+import os
+import sys
+import json
+import time
+import tarfile
+import logging
+import argparse
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import ocr_engine
+from screen_capture import IMAGE_EXTENSIONS
+from golf_reservation import GolfReservation
+from headless import apply_settings
+
+# slots: [(시간 문자열, (x, y)), ...], buttons: 인식한 "예약" 버튼 수
+SlotResult = namedtuple('SlotResult', ['name', 'slots', 'buttons', 'error', 'seconds'])
+
+def iter_sources(source):
+    """디렉터리(하위 폴더 포함) 또는 tar 파일의 이미지를 (이름, 파일 내용)으로 하나씩 반환
+
+    tar는 스트림 모드로 읽으므로 압축된 큰 아카이브도 메모리에 한꺼번에 올리지 않습니다.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    with open(path, 'rb') as f:
+                        yield os.path.relpath(path, source), f.read()
+        return
+
+    with tarfile.open(source, 'r|*') as archive:
+        for member in archive:
+            if member.isfile() and member.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield member.name, archive.extractfile(member).read()
+
+class OcrBatch:
+    """스크린샷 스트림을 작업 스레드에서 파싱하여 입력 순서대로 결과를 반환
+
+    동시에 처리 중인 이미지는 workers * 2개를 넘지 않으므로 입력 크기와 관계없이
+    메모리 사용량이 일정합니다. OCR은 GIL 밖에서 동작하므로 스레드로 병렬 처리합니다.
+    파서의 OCR 엔진은 바꾸지 않고 engine(기본: 작업 스레드 수만큼의 엔진 풀)으로 OCR합니다.
+    """
+
+    def __init__(self, workers=1, parser=None, engine=None):
+        self.workers = max(1, workers)
+        self.parser = parser or GolfReservation()
+        self.owns_engine = engine is None
+        self.engine = engine or ocr_engine.OcrEnginePool(size=self.workers)
+        self.images = 0
+        self.failed = 0    # 디코딩/OCR 오류
+        self.parsed = 0    # 시간대를 하나 이상 읽은 이미지
+        self.buttons = 0
+        self.slots = 0
+        self.elapsed = 0.0
+
+    def parse(self, name, data):
+        """이미지 한 장 파싱 (작업 스레드에서 실행)"""
+        started = time.perf_counter()
+        try:
+            image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                raise ValueError("이미지를 읽을 수 없습니다")
+            ocr = self.parser.ocr_slots(image, engine=self.engine)
+            with self.parser.metrics.stage('parse'):
+                slots = self.parser.parse_slots(ocr, image, origin=(0, 0), engine=self.engine)
+            buttons = sum(word.count("예약") for word in ocr.words)
+            return SlotResult(name, [(slot.time_str, slot.location) for slot in slots],
+                              buttons, None, time.perf_counter() - started)
+        except Exception as e:
+            return SlotResult(name, [], 0, str(e), time.perf_counter() - started)
+
+    def run(self, source, limit=None):
+        """source의 이미지마다 SlotResult를 입력 순서대로 반환하는 제너레이터"""
+        started = time.perf_counter()
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr-batch') as executor:
+            for index, (name, data) in enumerate(iter_sources(source)):
+                if limit is not None and index >= limit:
+                    break
+                pending.append(executor.submit(self.parse, name, data))
+                if len(pending) >= self.workers * 2:
+                    yield self._record(pending.popleft().result(), started)
+            while pending:
+                yield self._record(pending.popleft().result(), started)
+
+    def _record(self, result, started):
+        self.images += 1
+        if result.error is not None:
+            self.failed += 1
+        elif result.slots:
+            self.parsed += 1
+        self.buttons += result.buttons
+        self.slots += len(result.slots)
+        self.elapsed = time.perf_counter() - started
+        return result
+
+    @property
+    def images_per_second(self):
+        return self.images / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def success_rate(self):
+        """시간대를 하나 이상 읽은 이미지 비율"""
+        return self.parsed / self.images if self.images else 0.0
+
+    @property
+    def button_success_rate(self):
+        """"예약" 버튼 중 시간과 짝지은 버튼 비율"""
+        return self.slots / self.buttons if self.buttons else 0.0
+
+    def close(self):
+        """직접 만든 OCR 엔진 풀 정리 (전달받은 엔진은 호출한 쪽에서 정리)"""
+        if self.owns_engine:
+            self.engine.close()
+
+    def summary(self):
+        return (f"이미지 {self.images}장, {self.elapsed:.1f}초 ({self.images_per_second:.2f}장/초), "
+                f"파싱 성공 {self.success_rate:.1%} (버튼 단위 {self.button_success_rate:.1%}), "
+                f"오류 {self.failed}장")
+
+def load_expected(path):
+    """이전 --output 결과를 {이미지 이름: 시간 문자열 목록}으로 로드"""
+    expected = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                expected[record['image']] = [slot['time'] for slot in record['slots']]
+    return expected
+
+def main():
+    parser = argparse.ArgumentParser(description="스크린샷 일괄 OCR/시간대 파싱")
+    parser.add_argument('source', help="스크린샷 디렉터리 또는 tar 파일")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--limit', type=int, help="처리할 최대 이미지 수")
+    parser.add_argument('--config', help="GolfReservation 설정 JSON (slot_area, slot_profile 등)")
+    parser.add_argument('--output', help="이미지별 결과를 저장할 JSONL 파일")
+    parser.add_argument('--expected', help="비교할 이전 결과 JSONL 파일")
+    args = parser.parse_args()
+
+    reservation = GolfReservation()
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            apply_settings(reservation, json.load(f))
+    # ocr_workers를 설정했으면 실제 실행과 같은 병렬 OCR(TiledOcr) 경로로 측정
+    engine = None
+    if reservation.ocr_workers > 0:
+        engine = ocr_engine.TiledOcr(workers=reservation.ocr_workers)
+    batch = OcrBatch(workers=args.workers, parser=reservation, engine=engine)
+    expected = load_expected(args.expected) if args.expected else None
+    changed = 0
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for result in batch.run(args.source, limit=args.limit):
+            times = [time_str for time_str, _ in result.slots]
+            if result.error is not None:
+                logging.warning(f"{result.name}: {result.error}")
+            if expected is not None and result.name in expected and expected[result.name] != times:
+                changed += 1
+                logging.info(f"{result.name}: {expected[result.name]} -> {times}")
+            if output is not None:
+                record = {'image': result.name, 'error': result.error, 'buttons': result.buttons,
+                          'seconds': round(result.seconds, 4),
+                          'slots': [{'time': time_str, 'x': x, 'y': y}
+                                    for time_str, (x, y) in result.slots]}
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if output is not None:
+            output.close()
+        batch.close()
+        if engine is not None:
+            engine.close()
+
+    logging.info(batch.summary())
+    if expected is not None:
+        logging.info(f"이전 결과와 다른 이미지: {changed}장")
+    batch.parser.metrics.log_summary()
+    return 1 if changed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+import os
+import shlex
+import queue
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import cv2
+from lazy_import import lazy_import
+
+# pytesseract/PIL/tesserocr는 처음 OCR할 때 import (시작 시간 단축)
+pytesseract = lazy_import('pytesseract')
+Image = lazy_import('PIL.Image')
+tesserocr = lazy_import('tesserocr', optional=True)  # Tesseract C++ API 바인딩 (언어 모델을 한 번만 로드)
+
+TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+def tessdata_path():
+    """tessdata 폴더 경로 (TESSDATA_PREFIX 또는 tesseract_cmd 기준)"""
+    if os.environ.get('TESSDATA_PREFIX'):
+        return os.environ['TESSDATA_PREFIX']
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    if os.path.isabs(cmd):
+        path = os.path.join(os.path.dirname(cmd), 'tessdata')
+        if os.path.isdir(path):
+            return path
+    return None
+
+def parse_config(config):
+    """pytesseract 형식 설정 문자열에서 --psm 값과 -c 변수 추출"""
+    psm = None
+    variables = {}
+    tokens = shlex.split(config or '')
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == '--psm' and i + 1 < len(tokens):
+            psm = int(tokens[i + 1])
+            i += 1
+        elif token == '-c' and i + 1 < len(tokens):
+            key, _, value = tokens[i + 1].partition('=')
+            variables[key] = value
+            i += 1
+        i += 1
+    return psm, variables
+
+class OcrEnginePool:
+    """언어별로 미리 초기화된 Tesseract API 인스턴스를 재사용하는 풀
+
+    tesserocr가 없거나 초기화에 실패하면 pytesseract(프로세스 실행)로 대체합니다.
+    반환 형식은 pytesseract의 Output.DICT와 같습니다.
+    """
+
+    def __init__(self, lang='kor', size=2):
+        self.default_lang = lang
+        self.size = size
+        self.pools = {}    # lang -> 사용 가능한 API 큐
+        self.created = {}  # lang -> 생성한 API 수
+        self.lock = threading.Lock()
+        self.available = tesserocr is not None
+
+    def warm_up(self, lang=None):
+        """언어 모델을 미리 로드 (첫 OCR 지연 제거)"""
+        if not self.available:
+            return False
+        api = self._acquire(lang or self.default_lang)
+        if api is not None:
+            self._release(lang or self.default_lang, api)
+        return api is not None
+
+    def _acquire(self, lang):
+        with self.lock:
+            pool = self.pools.setdefault(lang, queue.Queue())
+            try:
+                return pool.get_nowait()
+            except queue.Empty:
+                pass
+            create = self.created.get(lang, 0) < self.size
+            if create:
+                self.created[lang] = self.created.get(lang, 0) + 1
+
+        if not create:
+            return pool.get()  # 모든 인스턴스가 사용 중이면 반납될 때까지 대기
+
+        try:
+            path = tessdata_path()
+            if path:
+                return tesserocr.PyTessBaseAPI(path=path, lang=lang)
+            return tesserocr.PyTessBaseAPI(lang=lang)
+        except Exception as e:
+            logging.warning(f"Tesseract API 초기화 실패, pytesseract 사용: {str(e)}")
+            with self.lock:
+                self.available = False
+                self.created[lang] -= 1
+            return None
+
+    def _release(self, lang, api):
+        self.pools[lang].put(api)
+
+    def _run(self, image, lang, config, read):
+        lang = lang or self.default_lang
+        api = self._acquire(lang) if self.available else None
+        if api is None:
+            return None
+
+        psm, variables = parse_config(config)
+        previous = {key: api.GetVariableAsString(key) for key in variables}
+        previous_psm = api.GetPageSegMode()
+        try:
+            if psm is not None:
+                api.SetPageSegMode(psm)
+            for key, value in variables.items():
+                api.SetVariable(key, value)
+            self._set_image(api, image)
+            return read(api)
+        finally:
+            # 다음 사용자를 위해 설정 복원
+            api.SetPageSegMode(previous_psm)
+            for key, value in previous.items():
+                if value is not None:
+                    api.SetVariable(key, value)
+            api.Clear()
+            self._release(lang, api)
+
+    def _set_image(self, api, image):
+        if isinstance(image, np.ndarray):
+            if image.ndim == 2:
+                # 그레이스케일 배열은 PIL 변환 없이 바로 전달
+                image = np.ascontiguousarray(image)
+                height, width = image.shape
+                api.SetImageBytes(image.tobytes(), width, height, 1, width)
+                return
+            image = Image.fromarray(image)
+        api.SetImage(image)
+
+    def image_to_data(self, image, lang=None, config=''):
+        """단어별 위치/신뢰도 (pytesseract Output.DICT 형식)"""
+        tsv = self._run(image, lang, config, lambda api: api.GetTSVText(0))
+        if tsv is None:
+            return pytesseract.image_to_data(image, lang=lang or self.default_lang, config=config,
+                                             output_type=pytesseract.Output.DICT)
+        return pytesseract.pytesseract.file_to_dict(TSV_HEADER + "\n" + tsv, '\t', -1)
+
+    def image_to_string(self, image, lang=None, config=''):
+        text = self._run(image, lang, config, lambda api: api.GetUTF8Text())
+        if text is None:
+            return pytesseract.image_to_string(image, lang=lang or self.default_lang, config=config)
+        return text
+
+    def close(self):
+        with self.lock:
+            for pool in self.pools.values():
+                while not pool.empty():
+                    pool.get_nowait().End()
+            self.pools = {}
+            self.created = {}
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_engine():
+    """프로세스 공용 OCR 엔진 풀"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = OcrEnginePool()
+        return _default_pool
+
+def image_to_data(image, lang='kor', config=''):
+    return get_engine().image_to_data(image, lang=lang, config=config)
+
+def image_to_string(image, lang='kor', config=''):
+    return get_engine().image_to_string(image, lang=lang, config=config)
+
+class OcrProfile:
+    """영역 종류별 OCR 설정 (전처리 + Tesseract 언어/페이지 분할 모드/허용 문자)"""
+
+    def __init__(self, name, lang='kor', psm=None, whitelist=None, upscale=1.0, binarize=False):
+        self.name = name
+        self.lang = lang
+        self.psm = psm              # 페이지 분할 모드 (7: 한 줄, 6: 균일한 블록, 11: 흩어진 글자)
+        self.whitelist = whitelist  # 인식을 허용할 문자
+        self.upscale = upscale      # 작은 글자 확대 비율
+        self.binarize = binarize    # Otsu 이진화 (흰 바탕 검은 글자로 맞춤)
+
+    @property
+    def config(self):
+        options = []
+        if self.psm is not None:
+            options.append(f"--psm {self.psm}")
+        if self.whitelist:
+            options.append(f"-c tessedit_char_whitelist={self.whitelist}")
+        return " ".join(options)
+
+    def preprocess(self, image):
+        image = np.asarray(image)
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        if self.upscale != 1.0:
+            image = cv2.resize(image, None, fx=self.upscale, fy=self.upscale,
+                               interpolation=cv2.INTER_CUBIC)
+        if self.binarize:
+            _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            if np.mean(image) < 127:
+                image = cv2.bitwise_not(image)
+        return image
+
+    def image_to_data(self, image, engine=None):
+        """전처리 후 OCR - 박스 좌표는 원본 이미지 기준으로 되돌려 반환"""
+        engine = engine or get_engine()
+        data = engine.image_to_data(self.preprocess(image), lang=self.lang, config=self.config)
+        if self.upscale != 1.0:
+            for key in ('left', 'top', 'width', 'height'):
+                data[key] = [int(v / self.upscale) for v in data.get(key, [])]
+        return data
+
+    def image_to_string(self, image, engine=None):
+        engine = engine or get_engine()
+        return engine.image_to_string(self.preprocess(image), lang=self.lang, config=self.config)
+
+PROFILES = {
+    # 기존 동작과 같은 기본 설정 (시간대 목록 전체)
+    'default': OcrProfile('default'),
+    # 버튼 글자 ("줄서기", "확인", "예약취소") - 흩어진 짧은 한글
+    'button_label': OcrProfile('button_label', lang='kor', psm=11),
+    # 시간 한 칸 - 숫자와 ':'만, 한 줄
+    'time_cell': OcrProfile('time_cell', lang='eng', psm=7, whitelist='0123456789:',
+                            upscale=3.0, binarize=True),
+}
+
+def get_profile(profile):
+    """프로필 이름 또는 OcrProfile 객체를 OcrProfile로 변환"""
+    if isinstance(profile, OcrProfile):
+        return profile
+    return PROFILES[profile]
+
+def split_bands(height, count, overlap):
+    """높이를 count개의 가로 띠로 나눔 - (띠 시작, 띠 끝, 담당 시작, 담당 끝)
+
+    이웃한 띠는 overlap만큼 겹치고, 겹친 구간은 가운데를 기준으로 나눠 담당합니다.
+    """
+    count = max(1, min(count, height))
+    step = height / count
+    bands = []
+    for i in range(count):
+        own_top = round(i * step)
+        own_bottom = round((i + 1) * step)
+        top = max(0, own_top - overlap // 2)
+        bottom = min(height, own_bottom + overlap // 2)
+        bands.append((top, bottom, own_top, own_bottom))
+    return bands
+
+def _init_worker(tesseract_cmd):
+    """작업 프로세스 초기화 - Tesseract 경로 설정 후 엔진 미리 로드"""
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    get_engine().warm_up()
+
+def _ocr_band(band, lang, config):
+    return image_to_data(band, lang=lang, config=config)
+
+class TiledOcr:
+    """영역을 겹치는 가로 띠로 나눠 프로세스 풀에서 동시에 OCR 후 결과를 합칩니다
+
+    반환 형식은 image_to_data와 같지만 단어(level 5) 행만 포함하며,
+    block_num은 띠마다 겹치지 않도록 다시 매깁니다.
+    """
+
+    def __init__(self, workers=4, overlap=48):
+        self.workers = workers
+        self.overlap = overlap  # 글자 높이보다 크게 설정
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(pytesseract.pytesseract.tesseract_cmd,))
+
+    def image_to_data(self, image, lang='kor', config=''):
+        image = np.asarray(image)
+        bands = split_bands(image.shape[0], self.workers, self.overlap)
+        futures = [self.executor.submit(_ocr_band, image[top:bottom], lang, config)
+                   for top, bottom, _, _ in bands]
+
+        merged = {}
+        for index, ((top, _, own_top, own_bottom), future) in enumerate(zip(bands, futures)):
+            data = future.result()
+            for i, level in enumerate(data.get('level', [])):
+                if level != 5:
+                    continue
+                # 단어 중심이 이 띠의 담당 구간에 있을 때만 사용 (겹친 구간 중복 제거)
+                center_y = top + data['top'][i] + data['height'][i] // 2
+                if not own_top <= center_y < own_bottom:
+                    continue
+                for key, values in data.items():
+                    value = values[i]
+                    if key == 'top':
+                        value += top
+                    elif key == 'block_num':
+                        value += index * 1000
+                    merged.setdefault(key, []).append(value)
+        if not merged:
+            return {key: [] for key in TSV_HEADER.split('\t')}
+        return merged
+
+    def image_to_string(self, image, lang='kor', config=''):
+        """작은 조각(시간 칸 재인식 등)은 띠로 나눌 필요가 없으므로 현재 프로세스에서 바로 OCR"""
+        return image_to_string(image, lang=lang, config=config)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,108 @@
+import time
+import logging
+from datetime import datetime
+import ocr_engine
+
+def sleep_until(deadline, spin=0.005):
+    """perf_counter 기준 deadline까지 대기 (마지막 spin초는 바쁜 대기로 오차를 줄임)"""
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        if remaining > spin:
+            time.sleep(remaining - spin)
+
+class ReleaseSniper:
+    """예약 오픈 시각에 맞춰 짧은 주기로 새로고침 -> 캡처 -> 파싱 -> 클릭을 반복
+
+    오픈 전 준비(arm) 단계에서 앱 영역, 줄서기 탭, 버튼 위치(AnchorCache), OCR 엔진과
+    현재 시간대 목록을 미리 확인해 두므로 오픈 이후에는 위치를 찾는 OCR 없이
+    새로 생긴 시간대만 바로 예약합니다. 오픈 시각부터 각 단계까지의 시간을 기록합니다.
+    """
+
+    def __init__(self, reservation, release_at, window=60.0, interval=0.3,
+                 drag_duration=0.1, settle_timeout=1.0):
+        self.reservation = reservation
+        self.release_at = release_at          # 오픈 시각 (datetime)
+        self.window = window                  # 오픈 후 반복할 시간 (초)
+        self.interval = interval              # 반복 주기 (초)
+        self.drag_duration = drag_duration    # 끌어당겨 새로고침 드래그 시간 (초)
+        self.settle_timeout = settle_timeout  # 새로고침 후 화면 안정 대기 최대 시간 (초)
+        self.release_clock = None             # 오픈 시각의 perf_counter 값
+        self.timeline = []                    # (단계, 오픈 후 경과 초)
+        self.cycles = 0
+
+    def mark(self, label):
+        elapsed = time.perf_counter() - self.release_clock
+        self.timeline.append((label, elapsed))
+        return elapsed
+
+    def arm(self):
+        """오픈 전 준비 - 실패하면 False"""
+        reservation = self.reservation
+        engine = reservation.ocr if isinstance(reservation.ocr, ocr_engine.OcrEnginePool) \
+            else ocr_engine.get_engine()
+        engine.warm_up()
+
+        if reservation.app_region is None:
+            reservation.app_region = reservation.find_app_region()
+            if reservation.app_region is None:
+                logging.error("앱 영역을 찾을 수 없어 오픈 대기를 취소합니다.")
+                return False
+        if not reservation.select_queue_tab():
+            return False
+        if reservation.current_reservation is not None:
+            # 더 좋은 시간대가 열리면 바로 취소할 수 있도록 버튼 위치 확인
+            reservation.locate_text(reservation.app_region, "예약취소")
+
+        # 오픈 전부터 있던 시간대를 기억해 두어 오픈 후에는 새로 생긴 시간대만 평가
+        reservation.check_reservation()
+        return True
+
+    def fire(self):
+        """오픈 후 window초 동안 반복 - 예약에 성공하면 True"""
+        reservation = self.reservation
+        deadline = self.release_clock + self.window
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            self.cycles += 1
+            try:
+                with reservation.metrics.stage('snipe_cycle'):
+                    reservation.pull_to_refresh(duration=self.drag_duration,
+                                                timeout=self.settle_timeout)
+                    self.mark(f"{self.cycles}회 새로고침")
+                    slots = reservation.read_slots()
+                    if slots is not None:
+                        self.mark(f"{self.cycles}회 파싱 ({len(slots[1])}개)")
+                        if reservation.book_best(slots[1]):
+                            return True
+            except Exception as e:
+                logging.error(f"오픈 직후 확인 중 오류 발생: {str(e)}")
+            sleep_until(started + self.interval)
+        return False
+
+    def run(self):
+        """준비 -> 오픈 시각까지 대기 -> 반복. 예약에 성공하면 True"""
+        logging.info(f"예약 오픈 대기 준비: {self.release_at:%H:%M:%S}")
+        if not self.arm():
+            return False
+
+        self.release_clock = time.perf_counter() + (self.release_at - datetime.now()).total_seconds()
+        lead = self.release_clock - time.perf_counter()
+        logging.info(f"준비 완료 - 오픈까지 {max(0.0, lead):.2f}초")
+        sleep_until(self.release_clock)
+
+        booked = self.fire()
+        metrics = self.reservation.metrics
+        if booked:
+            elapsed = self.mark("예약 완료")
+            metrics.observe('release_to_booked', elapsed)
+            logging.info(f"오픈 후 {elapsed:.3f}초 만에 예약 완료 (확인 {self.cycles}회)")
+        else:
+            logging.info(f"오픈 후 {self.window}초 동안 더 좋은 시간대가 없었습니다 (확인 {self.cycles}회)")
+        metrics.increment('release_snipes')
+        timeline = [f"{label} {elapsed:.3f}s" for label, elapsed in self.timeline]
+        if len(timeline) > 8:
+            timeline = timeline[:4] + ["..."] + timeline[-4:]
+        logging.info("오픈 타임라인: " + ", ".join(timeline))
+        return booked
@@ -1,20 +1,27 @@
 # pip install pytesseract pillow pyautogui schedule opencv-python numpy
+# (선택) pip install mss  - 고속 화면 캡처
+# (선택) pip install tesserocr  - Tesseract 프로세스 재실행 없이 OCR
 
 # Tesseract 경로 설정 (Windows에서 필요)
 # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 # https://github.com/tesseract-ocr/tessdata
 
-import pytesseract
-from PIL import ImageGrab, Image
-import pyautogui
+import ocr_engine
 import time
-import schedule
-from datetime import datetime
-import tkinter as tk
-from tkinter import ttk, messagebox
-import numpy as np
 import logging
 import os
+from lazy_import import lazy_import
+from screen_capture import create_backend
+from ui_wait import ScreenWatcher, wait_until
+from slot_grid import extract_slots, data_words
+from input_backend import create_input
+from metrics import StageMetrics, Profiler
+
+# 무거운 의존성은 처음 사용할 때 import (시작 시간 단축)
+pytesseract = lazy_import('pytesseract')
+schedule = lazy_import('schedule')
+tk = lazy_import('tkinter')
+ttk = lazy_import('tkinter.ttk')
 
 # 로깅 설정
 logging.basicConfig(
@@ -88,29 +95,29 @@ class GolfReservation:
         self.app_region = None
         self.target_start_time = 20  # 목표 시작 시간 (24시간 형식)
         self.target_end_time = 22    # 목표 종료 시간 (24시간 형식)
+        self.capture = create_backend()  # 화면 캡처 백엔드 (mss / PIL / replay)
+        self.watcher = ScreenWatcher(self.capture)  # 고정 대기 대신 화면 준비 상태 감시
+        self.input = create_input()  # 입력 백엔드 (INPUT_BACKEND: fast / human / pyautogui / record)
+        # 단계별 소요 시간 (METRICS_TEXTFILE / METRICS_SUMMARY, PROFILE 환경 변수로 기록)
+        self.metrics = StageMetrics.from_env('schedules')
+        self.profiler = Profiler.from_env('schedules')
+        self.last_error = None  # 마지막 run()을 끝낸 오류 (정상 종료면 None)
+        self.scheduled_job = None  # schedule에 등록한 작업 (다시 실행해도 한 번만 등록)
         
     def capture_screen(self, region=None):
-        """화면 캡처"""
+        """화면 캡처 (OCR용 그레이스케일 numpy 배열)"""
         try:
-            screenshot = ImageGrab.grab(bbox=region)
-            return screenshot
+            with self.metrics.stage('capture'):
+                return self.capture.grab(region, gray=True)
         except Exception as e:
             logging.error(f"화면 캡처 실패: {str(e)}")
             return None
 
-    def extract_text_from_image(self, image):
-        """이미지에서 텍스트 추출"""
-        try:
-            text = pytesseract.image_to_string(image, lang='kor')
-            return text.strip()
-        except Exception as e:
-            logging.error(f"텍스트 추출 실패: {str(e)}")
-            return ""
-
     def find_text_location(self, image, search_text):
         """이미지에서 특정 텍스트의 위치를 찾는 함수"""
         try:
-            data = pytesseract.image_to_data(image, lang='kor', output_type=pytesseract.Output.DICT)
+            with self.metrics.stage('ocr'):
+                data = ocr_engine.image_to_data(image, lang='kor')
             
             for i, text in enumerate(data['text']):
                 if search_text in text:
@@ -124,21 +131,43 @@ class GolfReservation:
             logging.error(f"텍스트 위치 찾기 실패: {str(e)}")
             return None
 
+    def click_at(self, location, text):
+        """화면 좌표 클릭"""
+        click_x, click_y = location
+        with self.metrics.stage('input'):
+            self.input.click(click_x, click_y)
+        logging.info(f"클릭 성공: {text} at ({click_x}, {click_y})")
+        return True
+
+    def locate_text(self, region, text):
+        """영역에서 텍스트를 찾아 화면 좌표(중심) 반환 (없으면 None)"""
+        screenshot = self.capture_screen(region)
+        if screenshot is None:
+            return None
+        location = self.find_text_location(screenshot, text)
+        if location is None:
+            return None
+        return (region[0] + location[0], region[1] + location[1])
+
+    def wait_for_text(self, region, text, timeout, reference=None):
+        """영역에 텍스트가 보일 때까지 대기하여 화면 좌표 반환 (시간 초과 시 None)
+
+        reference가 주어지면 먼저 화면이 바뀌고 안정될 때까지 기다린 뒤 찾습니다.
+        """
+        deadline = time.monotonic() + timeout
+        if reference is not None:
+            with self.metrics.stage('wait'):
+                self.watcher.wait_for_update(region, reference, timeout)
+        
+        return wait_until(lambda: self.locate_text(region, text),
+                          max(0.0, deadline - time.monotonic()), interval=0.1)
+
     def click_text(self, region, text):
         """특정 영역에서 텍스트를 찾아 클릭"""
         try:
-            screenshot = self.capture_screen(region)
-            if screenshot is None:
-                return False
-                
-            location = self.find_text_location(screenshot, text)
+            location = self.locate_text(region, text)
             if location:
-                x, y = location
-                click_x = region[0] + x
-                click_y = region[1] + y
-                pyautogui.click(click_x, click_y)
-                logging.info(f"클릭 성공: {text} at ({click_x}, {click_y})")
-                return True
+                return self.click_at(location, text)
             return False
         except Exception as e:
             logging.error(f"텍스트 클릭 실패: {str(e)}")
@@ -152,9 +181,13 @@ class GolfReservation:
     def refresh_app(self):
         """앱 새로고침"""
         try:
-            pyautogui.hotkey('f5')
+            reference = self.watcher.snapshot(self.app_region)
+            with self.metrics.stage('input'):
+                self.input.hotkey('f5')
             logging.info("앱 새로고침 완료")
-            time.sleep(5)
+            # 화면이 다시 그려지고 안정될 때까지 대기
+            with self.metrics.stage('wait'):
+                self.watcher.wait_for_update(self.app_region, reference, timeout=10)
         except Exception as e:
             logging.error(f"앱 새로고침 실패: {str(e)}")
 
@@ -169,34 +202,35 @@ class GolfReservation:
             if screenshot is None:
                 return False
 
-            text = self.extract_text_from_image(screenshot)
-            now = datetime.now()
-
-            for line in text.splitlines():
-                if "예약" in line:
-                    try:
-                        time_str = line.split("예약")[0].strip()
-                        reservation_time = datetime.strptime(time_str, "%H:%M").replace(
-                            year=now.year, month=now.month, day=now.day)
-                        
-                        if self.is_time_in_range(reservation_time):
-                            logging.info(f"예약 가능 시간대 발견: {time_str}")
-                            
-                            if self.click_text(self.app_region, time_str):
-                                time.sleep(2)
-                                
-                                # 모달 영역 계산
-                                modal_x = self.app_region[0] + (self.app_region[2] - self.app_region[0])//4
-                                modal_y = self.app_region[1] + (self.app_region[3] - self.app_region[1])//4
-                                modal_w = (self.app_region[2] - self.app_region[0])//2
-                                modal_h = (self.app_region[3] - self.app_region[1])//2
-                                modal_region = (modal_x, modal_y, modal_x + modal_w, modal_y + modal_h)
-                                
-                                if self.click_text(modal_region, "확인"):
-                                    logging.info("예약 완료!")
-                                    return True
-                    except ValueError:
-                        continue
+            with self.metrics.stage('ocr'):
+                data = ocr_engine.image_to_data(screenshot, lang='kor')
+            # 단어 박스를 행/열로 묶어 시간과 "예약" 버튼을 짝지음 (좌표는 화면 기준)
+            with self.metrics.stage('parse'):
+                slots = extract_slots(data_words(data), origin=self.app_region[:2])
+
+            for slot in slots:
+                if self.is_time_in_range(slot.time):
+                    logging.info(f"예약 가능 시간대 발견: {slot.time_str}")
+                    
+                    # 모달 영역 계산
+                    modal_x = self.app_region[0] + (self.app_region[2] - self.app_region[0])//4
+                    modal_y = self.app_region[1] + (self.app_region[3] - self.app_region[1])//4
+                    modal_w = (self.app_region[2] - self.app_region[0])//2
+                    modal_h = (self.app_region[3] - self.app_region[1])//2
+                    modal_region = (modal_x, modal_y, modal_x + modal_w, modal_y + modal_h)
+                    reference = self.watcher.snapshot(modal_region)
+                    
+                    # 추출한 좌표를 바로 클릭 (다시 OCR하지 않음)
+                    if self.click_at(slot.location, slot.time_str):
+                        # 모달이 뜨고 "확인" 버튼이 보일 때까지 대기 (애니메이션 중이거나
+                        # OCR이 한 번 놓쳐도 시간 안에서는 다시 찾음)
+                        location = self.wait_for_text(modal_region, "확인", timeout=4,
+                                                      reference=reference)
+                        if location is None:
+                            logging.warning(f"확인 버튼을 찾지 못했습니다: {slot.time_str}")
+                        elif self.click_at(location, "확인"):
+                            logging.info("예약 완료!")
+                            return True
             
             logging.info("예약 가능한 시간대가 없습니다.")
             return False
@@ -206,20 +240,31 @@ class GolfReservation:
             return False
 
     def job(self):
-        """주기적으로 실행할 작업"""
-        self.refresh_app()
-        if self.check_reservation():
-            logging.info("예약 성공! 프로그램을 종료합니다.")
-            return True
-        return False
+        """주기적으로 실행할 작업 (한 번의 확인 주기 전체 시간을 'cycle'로 기록)"""
+        try:
+            with self.metrics.stage('cycle'):
+                self.refresh_app()
+                if self.check_reservation():
+                    logging.info("예약 성공! 프로그램을 종료합니다.")
+                    return True
+                return False
+        finally:
+            self.metrics.maybe_flush()
 
     def run(self):
-        """메인 실행 함수"""
+        """메인 실행 함수 (오류로 끝나면 last_error에 기록)"""
+        self.last_error = None
+        if self.profiler is not None:
+            self.profiler.start()
         try:
-            # 영역 선택
-            selector = RegionSelector()
-            logging.info("앱 영역을 선택해주세요.")
-            self.app_region = selector.get_region()
+            # Tesseract 언어 모델 미리 로드
+            ocr_engine.get_engine().warm_up()
+            
+            # 영역 선택 (설정 파일 등으로 미리 지정되지 않은 경우)
+            if self.app_region is None:
+                selector = RegionSelector()
+                logging.info("앱 영역을 선택해주세요.")
+                self.app_region = selector.get_region()
             
             if self.app_region is None:
                 logging.error("영역이 선택되지 않았습니다.")
@@ -227,8 +272,9 @@ class GolfReservation:
             
             logging.info(f"선택된 영역: {self.app_region}")
             
-            # 스케줄러 설정
-            schedule.every(5).minutes.do(self.job)
+            # 스케줄러 설정 (오류 후 다시 실행될 때 작업이 중복 등록되지 않도록 한 번만)
+            if self.scheduled_job is None:
+                self.scheduled_job = schedule.every(5).minutes.do(self.job)
             
             # 첫 실행
             if self.job():
@@ -243,6 +289,12 @@ class GolfReservation:
             logging.info("프로그램이 사용자에 의해 종료되었습니다.")
         except Exception as e:
             logging.error(f"프로그램 실행 중 오류 발생: {str(e)}")
+            self.last_error = e
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+            self.metrics.log_summary()
+            self.metrics.close()
 
 if __name__ == "__main__":
     # Tesseract 경로 설정 (Windows의 경우)
@@ -0,0 +1,186 @@
+import os
+import glob
+import threading
+import cv2
+import numpy as np
+from lazy_import import lazy_import
+
+mss = lazy_import('mss', optional=True)  # X11 공유 메모리(XShm) / Windows BitBlt 기반 고속 캡처
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+class CaptureBackend:
+    """화면 캡처 백엔드 공통 인터페이스
+
+    grab(bbox)은 (left, top, right, bottom) 영역을 numpy 배열로 반환합니다.
+    gray=True면 그레이스케일, 아니면 BGR 채널 순서입니다. bbox가 None이면 전체 화면.
+    """
+
+    def grab(self, bbox=None, gray=False):
+        raise NotImplementedError
+
+    def grab_into(self, bbox, out):
+        """그레이스케일 캡처 결과를 미리 할당한 out 배열에 기록 (실패 시 False)"""
+        frame = self.grab(bbox, gray=True)
+        if frame is None or frame.shape != out.shape:
+            return False
+        np.copyto(out, frame)
+        return True
+
+    def screen_size(self):
+        frame = self.grab(None, gray=True)
+        return frame.shape[1], frame.shape[0]
+
+    def close(self):
+        pass
+
+class MssBackend(CaptureBackend):
+    """mss 기반 캡처 (BGRA 버퍼를 복사 없이 numpy 뷰로 사용)"""
+
+    def __init__(self):
+        if mss is None:
+            raise RuntimeError("mss가 설치되어 있지 않습니다 (pip install mss)")
+        # mss 인스턴스는 생성한 스레드에서만 사용할 수 있으므로 스레드별로 생성
+        self._local = threading.local()
+
+    def _sct(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+        return sct
+
+    def grab(self, bbox=None, gray=False):
+        sct = self._sct()
+        if bbox is None:
+            monitor = sct.monitors[1]  # ImageGrab.grab()과 같은 주 모니터
+        else:
+            left, top, right, bottom = bbox
+            monitor = {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
+
+        return self._to_array(sct.grab(monitor), gray)
+
+    def _to_array(self, shot, gray, out=None):
+        width, height = shot.size
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(height, width, 4)
+        if gray:
+            if out is not None:
+                return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=out)
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY)
+        return bgra[:, :, :3]
+
+    def grab_into(self, bbox, out):
+        """BGRA 버퍼를 out에 바로 그레이스케일로 변환 (중간 배열 없음)"""
+        left, top, right, bottom = bbox
+        if out.shape != (bottom - top, right - left):
+            return False
+        monitor = {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
+        self._to_array(self._sct().grab(monitor), True, out=out)
+        return True
+
+    def screen_size(self):
+        monitor = self._sct().monitors[1]
+        return monitor['width'], monitor['height']
+
+    def close(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
+
+class PilBackend(CaptureBackend):
+    """PIL ImageGrab 기반 캡처 (mss가 없을 때 사용)"""
+
+    def grab(self, bbox=None, gray=False):
+        from PIL import ImageGrab
+        rgb = np.asarray(ImageGrab.grab(bbox=bbox))
+        if gray:
+            return cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+class ReplayBackend(CaptureBackend):
+    """녹화된 이미지 폴더나 동영상 파일을 화면 대신 재생 (헤드리스 환경용)
+
+    origin은 녹화 프레임 왼쪽 위가 화면에서 위치하던 좌표입니다.
+    """
+
+    def __init__(self, source, origin=(0, 0), loop=False):
+        self.source = source
+        self.origin = origin
+        self.loop = loop
+        self.files = None
+        self.video = None
+        self.index = 0
+        self.last_frame = None
+
+        if os.path.isdir(source):
+            self.files = sorted(f for f in glob.glob(os.path.join(source, '*'))
+                                if f.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            self.video = cv2.VideoCapture(source)
+            if not self.video.isOpened():
+                raise RuntimeError(f"재생 소스를 열 수 없습니다: {source}")
+
+    def next_frame(self):
+        """다음 프레임(BGR)을 읽습니다. 끝에 도달하면 None"""
+        if self.files is not None:
+            if self.index >= len(self.files):
+                if not self.loop or not self.files:
+                    return None
+                self.index = 0
+            frame = cv2.imread(self.files[self.index])
+            self.index += 1
+            return frame
+
+        ok, frame = self.video.read()
+        if not ok and self.loop:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.video.read()
+        self.index += 1
+        return frame if ok else None
+
+    def grab(self, bbox=None, gray=False):
+        frame = self.next_frame()
+        if frame is None:
+            return None
+        self.last_frame = frame
+
+        if bbox is not None:
+            ox, oy = self.origin
+            left, top, right, bottom = bbox
+            frame = frame[max(0, top - oy):max(0, bottom - oy),
+                          max(0, left - ox):max(0, right - ox)]
+        if gray:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return frame
+
+    def screen_size(self):
+        if self.last_frame is None:
+            return super().screen_size()
+        return self.last_frame.shape[1], self.last_frame.shape[0]
+
+    def close(self):
+        if self.video is not None:
+            self.video.release()
+
+def create_backend(name=None, source=None):
+    """캡처 백엔드 생성
+
+    name이 없으면 환경변수 CAPTURE_BACKEND ('mss', 'pil', 'replay')를 따르고,
+    그것도 없으면 mss가 설치되어 있으면 mss, 아니면 PIL을 사용합니다.
+    replay 소스는 source 또는 환경변수 CAPTURE_REPLAY로 지정합니다.
+    """
+    name = name or os.environ.get('CAPTURE_BACKEND')
+    if name is None:
+        name = 'mss' if mss is not None else 'pil'
+
+    if name == 'mss':
+        return MssBackend()
+    if name == 'pil':
+        return PilBackend()
+    if name == 'replay':
+        source = source or os.environ.get('CAPTURE_REPLAY')
+        if not source:
+            raise ValueError("replay 백엔드에는 재생 소스가 필요합니다 (CAPTURE_REPLAY)")
+        return ReplayBackend(source)
+    raise ValueError(f"알 수 없는 캡처 백엔드: {name}")
@@ -0,0 +1,115 @@
+import heapq
+import math
+from adaptive_scheduler import TimeWindow
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+def parse_weekday(value):
+    """요일 이름("sat") 또는 번호(월요일 0)를 번호로 변환"""
+    if isinstance(value, int):
+        return value % 7
+    value = str(value).strip().lower()
+    if value.isdigit():
+        return int(value) % 7
+    return WEEKDAYS.index(value[:3])
+
+class PreferenceWindow(TimeWindow):
+    """선호하는 시간 구간과 가중치 (자정을 넘는 구간 허용)"""
+
+    def __init__(self, start, end, weight=1.0):
+        super().__init__(start, end, interval=None)
+        self.weight = weight
+
+    def __repr__(self):
+        return f"PreferenceWindow({self.start:%H:%M}-{self.end:%H:%M}, {self.weight})"
+
+class SlotPreferences:
+    """시간대 점수 - 점수가 높을수록 좋은 시간대, 같으면 하루 중 이른 시각이 우선
+
+    시간대가 어느 구간에도 들지 않거나 제외한 요일이면 점수는 None(예약 대상 아님)입니다.
+    요일 가중치는 시간대 datetime의 날짜(예약하는 날)를 기준으로 합니다.
+    """
+
+    def __init__(self, windows, weekday_weights=None):
+        self.windows = list(windows)
+        # 요일 번호 -> 추가 가중치 (None이면 그 요일은 제외)
+        self.weekday_weights = {parse_weekday(day): weight
+                                for day, weight in (weekday_weights or {}).items()}
+
+    def score(self, slot_time):
+        weights = [window.weight for window in self.windows if window.contains(slot_time)]
+        if not weights:
+            return None
+        day_weight = self.weekday_weights.get(slot_time.weekday(), 0.0)
+        if day_weight is None:
+            return None
+        return max(weights) + day_weight
+
+    def key(self, slot_time):
+        """우선순위 큐 정렬 키 (작을수록 좋음)
+
+        점수가 같으면 날짜가 아닌 시각으로 비교합니다. 자정을 넘겨 실행해도 어제 날짜로
+        기록된 현재 예약이 오늘 읽은 시간대보다 항상 좋게 판정되지 않도록 하기 위함입니다.
+        """
+        score = self.score(slot_time)
+        return (-score if score is not None else math.inf, slot_time.time())
+
+    def is_better(self, new_time, current_time):
+        """new_time이 현재 예약보다 좋은지 (현재 예약이 없으면 대상 시간대면 True)"""
+        if self.score(new_time) is None:
+            return False
+        if current_time is None:
+            return True
+        return self.key(new_time) < self.key(current_time)
+
+class SlotDecider:
+    """새로고침마다 시간대 집합의 변화를 계산하고, 새로 생긴 시간대만 우선순위 큐에 넣음
+
+    이미 보았던 시간대는 다시 평가하지 않으므로 예약 시도는 새로 열린 시간대가
+    현재 예약보다 좋을 때만 일어납니다. 사라진 시간대는 큐에서 꺼낼 때 버립니다.
+    """
+
+    def __init__(self, preferences):
+        self.preferences = preferences
+        self.known = {}     # 시간 -> 최신 Slot (새로고침마다 좌표 갱신)
+        self.entries = {}   # 시간 -> 큐에 넣은 항목 번호 (사라졌다 다시 생기면 새 번호)
+        self.queue = []     # (정렬 키, 항목 번호, 시간)
+        self.counter = 0
+
+    def _push(self, slot):
+        self.counter += 1
+        self.entries[slot.time] = self.counter
+        heapq.heappush(self.queue, (self.preferences.key(slot.time), self.counter, slot.time))
+
+    def update(self, slots):
+        """이번 새로고침의 시간대 목록 반영 - (새로 생긴 Slot 목록, 사라진 Slot 목록) 반환"""
+        current = {slot.time: slot for slot in slots}
+        removed = [slot for time, slot in self.known.items() if time not in current]
+        added = [slot for time, slot in current.items() if time not in self.known]
+        for slot in removed:
+            # 점수가 없어 큐에 넣지 않았거나 이미 꺼낸 시간대는 항목이 없음
+            self.entries.pop(slot.time, None)
+        self.known = current
+        for slot in added:
+            if self.preferences.score(slot.time) is not None:
+                self._push(slot)
+        return sorted(added), sorted(removed)
+
+    def pop_better(self, current_time):
+        """현재 예약보다 좋은 가장 높은 순위의 시간대를 큐에서 꺼냄 (없으면 None)"""
+        while self.queue:
+            _, entry, time = self.queue[0]
+            if self.entries.get(time) != entry:
+                heapq.heappop(self.queue)  # 사라졌거나 다시 넣은 시간대의 이전 항목
+                continue
+            if not self.preferences.is_better(time, current_time):
+                return None  # 가장 좋은 후보도 현재 예약보다 못함
+            heapq.heappop(self.queue)
+            del self.entries[time]
+            return self.known[time]
+        return None
+
+    def requeue(self, slot):
+        """예약 시도에 실패한 시간대를 다음 확인 때 다시 시도하도록 큐에 넣음"""
+        if slot.time in self.known and slot.time not in self.entries:
+            self._push(slot)
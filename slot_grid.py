@@ -0,0 +1,142 @@
+import re
+from datetime import datetime
+from collections import namedtuple
+
+TIME_PATTERN = re.compile(r'(\d{1,2})\s*[:;.]\s*(\d{2})')
+BUTTON_TEXT = "예약"
+
+# time: 예약하는 날짜(date, 기본 오늘)의 datetime, location: 시간 글자 중심, button: "예약" 버튼 중심 (모두 화면 좌표)
+Slot = namedtuple('Slot', ['time', 'time_str', 'location', 'button', 'confidence'])
+
+def find_time(text, last=False):
+    """OCR 문자열에서 "HH:MM" 시간을 찾아 (시간 문자열, 시작 위치, 끝 위치) 반환 (없으면 None)
+
+    OCR이 ':'를 '.', ';'로 읽거나 앞뒤에 잡음을 붙여도 시간을 찾습니다.
+    last이면 여러 시간 중 마지막(버튼에 가장 가까운) 시간을 반환합니다.
+    """
+    matches = list(TIME_PATTERN.finditer(text))
+    if last:
+        matches.reverse()
+    for match in matches:
+        time_str = f"{match.group(1)}:{match.group(2)}"
+        try:
+            datetime.strptime(time_str, "%H:%M")
+        except ValueError:
+            continue
+        return time_str, match.start(), match.end()
+    return None
+
+def parse_time_text(text, last=False):
+    """OCR 문자열에서 "HH:MM" 시간을 찾아 반환 (없으면 None)"""
+    found = find_time(text, last)
+    return found[0] if found is not None else None
+
+def _match_time(candidates):
+    """후보 단어들을 이어 붙여 시간을 찾고, (시간 문자열, 시간을 이루는 단어 박스 목록) 반환"""
+    text = ""
+    spans = []
+    for word, box, _ in candidates:
+        if text:
+            text += " "
+        spans.append((len(text), len(text) + len(word), box))
+        text += word
+    found = find_time(text, last=True)
+    if found is None:
+        return None, []
+    time_str, start, end = found
+    return time_str, [box for word_start, word_end, box in spans if word_start < end and start < word_end]
+
+def data_words(data):
+    """image_to_data 결과(Output.DICT)를 (단어, 박스, 신뢰도) 목록으로 변환"""
+    words = []
+    for i, text in enumerate(data['text']):
+        text = text.strip()
+        if text:
+            words.append((text, (data['left'][i], data['top'][i], data['width'][i], data['height'][i]),
+                          float(data['conf'][i])))
+    return words
+
+def group_rows(words, tolerance=0.5):
+    """세로 중심이 가까운 단어들을 한 행으로 묶음
+
+    Tesseract의 줄 구분과 달리 열 사이가 넓어 다른 줄/블록으로 나뉜 단어도
+    같은 높이에 있으면 같은 행이 됩니다. 행은 위에서 아래, 행 안의 단어는 왼쪽에서
+    오른쪽 순서입니다.
+    """
+    rows = []  # [중심 y, 글자 높이, 단어 목록]
+    for word in sorted(words, key=lambda w: w[1][1] + w[1][3] / 2):
+        _, (x, y, w, h), _ = word
+        center = y + h / 2
+        if rows and abs(center - rows[-1][0]) <= tolerance * max(h, rows[-1][1]):
+            row = rows[-1]
+            row[2].append(word)
+            row[0] += (center - row[0]) / len(row[2])
+            row[1] = max(row[1], h)
+        else:
+            rows.append([center, h, [word]])
+    return [sorted(row[2], key=lambda w: w[1][0]) for row in rows]
+
+def _center(boxes, origin):
+    x0 = min(x for x, _, _, _ in boxes)
+    y0 = min(y for _, y, _, _ in boxes)
+    x1 = max(x + w for x, _, w, _ in boxes)
+    y1 = max(y + h for _, y, _, h in boxes)
+    return (origin[0] + (x0 + x1) // 2, origin[1] + (y0 + y1) // 2)
+
+def _time_above(rows, index, box, max_rows=2):
+    """버튼 바로 위 행들에서 가로로 겹치는 시간 단어 찾기 (시간과 버튼이 위아래로 놓인 카드형 배치)"""
+    x, y, w, h = box
+    for row in reversed(rows[max(0, index - max_rows):index]):
+        for text, (wx, wy, ww, wh), conf in row:
+            if wx < x + w and x < wx + ww and y - (wy + wh) <= 2 * h:
+                time_str = parse_time_text(text)
+                if time_str is not None:
+                    return time_str, [(wx, wy, ww, wh)], conf
+    return None
+
+def extract_slots(words, origin=(0, 0), reread=None, date=None):
+    """OCR 단어 박스를 행/열로 묶어 시간과 "예약" 버튼을 짝지은 Slot 목록 반환 (시간순)
+
+    한 행에 여러 열의 시간대가 있으면 각 버튼마다 직전 버튼 이후 단어들에서 시간을
+    찾습니다. 시간을 읽지 못하면 reread(시간 칸 박스 목록)로 다시 읽고, 버튼 왼쪽에
+    글자가 없으면 바로 위 행에서 찾습니다. 좌표는 origin 기준 화면 좌표이고,
+    시간대의 날짜는 date(화면에 표시된 예약 날짜, 기본 오늘)입니다.
+    """
+    date = date or datetime.now()
+    rows = group_rows(words)
+    slots = []
+    for index, row in enumerate(rows):
+        pending = []  # 직전 버튼 이후의 단어들
+        for text, box, conf in row:
+            if BUTTON_TEXT not in text:
+                pending.append((text, box, conf))
+                continue
+
+            # OCR이 시간과 버튼을 한 단어로 붙여 읽은 경우 ("20:10예약")
+            prefix = text.split(BUTTON_TEXT)[0]
+            candidates = pending + ([(prefix, box, conf)] if prefix else [])
+            pending = []
+
+            # 시간 패턴에 걸린 단어만 클릭 위치에 사용 (코트 번호, 가격 등 다른 숫자 제외)
+            time_str, time_boxes = _match_time(candidates)
+            confidences = [c for _, _, c in candidates]
+            if time_str is None and candidates and reread is not None:
+                time_str = reread([b for _, b, _ in candidates])
+            if time_str is None and not candidates:
+                found = _time_above(rows, index, box)
+                if found is not None:
+                    time_str, time_boxes, time_conf = found
+                    confidences = [time_conf]
+            if time_str is None:
+                continue
+
+            hour, minute = map(int, time_str.split(":"))
+            slots.append(Slot(
+                time=date.replace(hour=hour, minute=minute, second=0, microsecond=0),
+                time_str=time_str,
+                location=_center(time_boxes or [b for _, b, _ in candidates] or [box], origin),
+                button=_center([box], origin),
+                confidence=min(confidences + [conf])))
+
+    slots.sort()
+    return slots
@@ -0,0 +1,97 @@
+import os
+import glob
+import hashlib
+import cv2
+import numpy as np
+
+# 전처리 방식이 바뀌면 버전을 올려서 기존 캐시를 무효화
+CACHE_VERSION = 1
+CACHE_DIR = '.template_cache'
+
+def preprocess(image, out=None):
+    """매칭용 전처리 (그레이스케일 -> 히스토그램 평활화 -> 노이즈 제거)
+
+    out(같은 크기의 uint8 배열)이 주어지면 새 배열을 만들지 않고 out에 기록합니다.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if out is None or out.shape != image.shape:
+        image = cv2.equalizeHist(image)
+        return cv2.GaussianBlur(image, (3, 3), 0)
+    cv2.equalizeHist(image, dst=out)
+    return cv2.GaussianBlur(out, (3, 3), 0, dst=out)
+
+def _cache_key(path):
+    """원본 파일의 크기/수정시각과 캐시 버전으로 캐시 키 생성"""
+    stat = os.stat(path)
+    raw = f"{CACHE_VERSION}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+class TemplateBank:
+    """전처리된 템플릿 묶음 (.npy 캐시를 메모리 맵으로 로드)"""
+
+    def __init__(self, files, cache_dir=None):
+        self.files = list(files)
+        self.cache_dir = cache_dir
+        self.names = []
+        self.templates = []  # 전처리된 그레이스케일 템플릿
+        self.load()
+
+    def _cache_path(self, path):
+        cache_dir = self.cache_dir or os.path.join(os.path.dirname(path), CACHE_DIR)
+        name = os.path.splitext(os.path.basename(path))[0]
+        return cache_dir, name, os.path.join(cache_dir, f"{name}.{_cache_key(path)}.npy")
+
+    def load_template(self, path):
+        """캐시가 유효하면 캐시에서, 아니면 PNG를 디코딩하여 전처리 후 캐시에 저장"""
+        if not os.path.exists(path):
+            return None
+        cache_dir, name, cache_path = self._cache_path(path)
+
+        if os.path.exists(cache_path):
+            try:
+                return np.load(cache_path, mmap_mode='r')
+            except Exception as e:
+                print(f"{cache_path} 캐시 로드 오류: {e}")
+
+        image = cv2.imread(path)
+        if image is None:
+            return None
+        template = preprocess(image)
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # 오래된 캐시 정리
+            for stale in glob.glob(os.path.join(cache_dir, f"{name}.*.npy")):
+                os.remove(stale)
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, template)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"{cache_path} 캐시 저장 오류: {e}")
+
+        return template
+
+    def load(self):
+        """모든 템플릿 로드"""
+        self.names = []
+        self.templates = []
+        for file in self.files:
+            try:
+                template = self.load_template(file)
+                if template is not None:
+                    self.names.append(file)
+                    self.templates.append(template)
+                    print(f"{file} 로드 성공")
+                else:
+                    print(f"{file} 로드 실패")
+            except Exception as e:
+                print(f"{file} 로드 오류: {e}")
+        return self.templates
+
+    def __len__(self):
+        return len(self.templates)
+
+    def __iter__(self):
+        return iter(self.templates)
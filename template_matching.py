@@ -0,0 +1,294 @@
+import os
+from collections import namedtuple
+import cv2
+import numpy as np
+
+MatchResult = namedtuple('MatchResult', ['score', 'location', 'template_index', 'scale', 'method'])
+
+NO_MATCH = MatchResult(0.0, None, None, None, None)
+
+def _top_peaks(result, count, radius):
+    """매칭 결과에서 서로 겹치지 않는 상위 후보 위치를 찾습니다"""
+    result = result.copy()
+    peaks = []
+    for _ in range(count):
+        _, max_val, _, (x, y) = cv2.minMaxLoc(result)
+        if max_val <= -1.0:
+            break
+        peaks.append((max_val, (x, y)))
+        result[max(0, y - radius):y + radius + 1, max(0, x - radius):x + radius + 1] = -1.0
+    return peaks
+
+def scaled_variants(templates, scales):
+    """템플릿별 배율 변형 목록 - (템플릿 번호, 배율, 배율을 적용한 템플릿)"""
+    variants = []
+    for index, template in enumerate(templates):
+        template = np.ascontiguousarray(template)
+        for scale in scales:
+            if scale == 1.0:
+                scaled = template
+            else:
+                interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+                scaled = cv2.resize(template, None, fx=scale, fy=scale,
+                                    interpolation=interpolation)
+            variants.append((index, scale, scaled))
+    return variants
+
+class TemplateMatcher:
+    """매칭 엔진 공통 인터페이스 - match(screen_gray, threshold)는 MatchResult 반환"""
+
+    def match(self, screen_gray, threshold=None):
+        raise NotImplementedError
+
+    def match_many(self, images, threshold=None, executor=None):
+        """여러 화면(영역)을 매칭 - 영역마다 match()를 호출하고, executor가 주어지면 동시에 실행
+
+        영역을 묶어 한 번에 계산하지는 않습니다 (FftMatcher는 화면 스펙트럼을 묶어 구함).
+        OpenCV 매칭은 GIL을 놓으므로 스레드 풀로도 영역 수만큼 병렬로 처리됩니다.
+        """
+        if executor is None or len(images) < 2:
+            return [self.match(image, threshold) for image in images]
+        return list(executor.map(lambda image: self.match(image, threshold), images))
+
+class PyramidMatcher(TemplateMatcher):
+    """축소 피라미드에서 후보를 찾고 원본 해상도에서 후보 주변만 정밀 매칭하는 엔진"""
+
+    def __init__(self, templates, scales=(0.8, 0.9, 1.0, 1.1, 1.2), levels=1, top_k=3,
+                 methods=(cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED), min_coarse_size=8):
+        self.scales = tuple(scales)
+        self.levels = levels                # 피라미드 단계 수 (1이면 1/2 해상도)
+        self.factor = 2 ** levels
+        self.top_k = top_k                  # 정밀 매칭할 후보 수
+        self.methods = tuple(methods)
+        self.min_coarse_size = min_coarse_size
+        self.variants = []                  # (템플릿 번호, 배율, 원본 템플릿, 축소 템플릿)
+        self.set_templates(templates)
+
+    def set_templates(self, templates):
+        """배율별 템플릿과 피라미드 템플릿을 미리 만들어 둡니다"""
+        self.variants = []
+        for index, scale, scaled in scaled_variants(templates, self.scales):
+            coarse = self._pyramid(scaled)
+            if min(coarse.shape[:2]) < self.min_coarse_size:
+                coarse = None  # 너무 작으면 원본 해상도에서 바로 매칭
+            self.variants.append((index, scale, scaled, coarse))
+
+    def _pyramid(self, image):
+        for _ in range(self.levels):
+            image = cv2.pyrDown(image)
+        return image
+
+    def _refine(self, screen_gray, variant, x, y, margin):
+        """후보 위치 주변 창에서만 원본 해상도 매칭"""
+        index, scale, template, _ = variant
+        th, tw = template.shape[:2]
+        sh, sw = screen_gray.shape[:2]
+        x0 = max(0, x - margin)
+        y0 = max(0, y - margin)
+        x1 = min(sw, x + tw + margin)
+        y1 = min(sh, y + th + margin)
+        window = screen_gray[y0:y1, x0:x1]
+        if window.shape[0] < th or window.shape[1] < tw:
+            return NO_MATCH
+
+        best = NO_MATCH
+        for method in self.methods:
+            result = cv2.matchTemplate(window, template, method)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val > best.score:
+                best = MatchResult(max_val, (x0 + max_loc[0], y0 + max_loc[1]), index, scale, method)
+        return best
+
+    def match(self, screen_gray, threshold=None):
+        """가장 정확도가 높은 매칭 결과 반환 (threshold를 넘으면 바로 반환)"""
+        sh, sw = screen_gray.shape[:2]
+        coarse_screen = self._pyramid(screen_gray)
+        direct = []      # 원본 해상도에서 전체를 매칭할 후보
+        candidates = []  # 축소 단계에서 찾은 후보
+
+        for variant in self.variants:
+            _, _, template, coarse = variant
+            th, tw = template.shape[:2]
+            if th > sh or tw > sw:
+                continue
+            if coarse is None or coarse.shape[0] > coarse_screen.shape[0] \
+                    or coarse.shape[1] > coarse_screen.shape[1]:
+                # 축소 단계를 쓸 수 없으면 원본 전체를 후보 창으로 사용
+                direct.append((variant, 0, 0, max(sh, sw)))
+                continue
+
+            result = cv2.matchTemplate(coarse_screen, coarse, cv2.TM_CCOEFF_NORMED)
+            radius = max(1, min(coarse.shape[:2]) // 2)
+            for score, (cx, cy) in _top_peaks(result, self.top_k, radius):
+                candidates.append((score, variant, cx * self.factor, cy * self.factor,
+                                   2 * self.factor))
+
+        # 축소 단계 점수가 높은 후보부터 정밀 매칭
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        best = NO_MATCH
+        for variant, x, y, margin in direct + [c[1:] for c in candidates[:self.top_k]]:
+            refined = self._refine(screen_gray, variant, x, y, margin)
+            if refined.score > best.score:
+                best = refined
+            if threshold is not None and best.score > threshold:
+                break
+        return best
+
+class FftMatcher(TemplateMatcher):
+    """모든 템플릿(배율 변형 포함)을 주파수 영역에서 한 번에 상관시키는 엔진
+
+    템플릿 스펙트럼은 화면 크기별로 캐시하고, 화면 FFT는 프레임당 한 번만 계산합니다.
+    정규화에 필요한 창 합계/제곱합은 적분 영상으로 구하므로 템플릿이 늘어도
+    프레임당 추가 비용은 스펙트럼 곱과 역변환뿐입니다.
+    TM_CCORR_NORMED 점수는 TM_CCOEFF_NORMED 분자에서 바로 유도하므로 추가 상관이 없습니다.
+    """
+
+    def __init__(self, templates, scales=(0.8, 0.9, 1.0, 1.1, 1.2),
+                 methods=(cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED), max_cached_shapes=4):
+        self.scales = tuple(scales)
+        self.methods = tuple(methods)
+        unsupported = set(self.methods) - {cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED}
+        if unsupported:
+            raise ValueError(f"FftMatcher가 지원하지 않는 매칭 방법: {unsupported}")
+        self.max_cached_shapes = max_cached_shapes
+        self.set_templates(templates)
+
+    def set_templates(self, templates):
+        """템플릿별 평균을 뺀 값과 정규화 상수를 미리 계산"""
+        self.template_count = len(templates)
+        self.variants = []  # (템플릿 번호, 배율, 평균을 뺀 템플릿, 평균, 평균 제거 노름, 원본 노름)
+        for index, scale, scaled in scaled_variants(templates, self.scales):
+            data = scaled.astype(np.float32)
+            mean = float(data.mean())
+            centered = data - mean
+            self.variants.append((index, scale, centered, mean,
+                                  float(np.sqrt(np.sum(centered * centered))),
+                                  float(np.sqrt(np.sum(data * data)))))
+        self.spectra = {}  # 화면 크기 -> (FFT 크기, 적용 가능한 변형 번호, 스펙트럼 묶음)
+
+    def _spectra_for(self, shape):
+        cached = self.spectra.get(shape)
+        if cached is not None:
+            return cached
+
+        sh, sw = shape
+        fft_shape = (cv2.getOptimalDFTSize(sh), cv2.getOptimalDFTSize(sw))
+        usable = [i for i, v in enumerate(self.variants)
+                  if v[2].shape[0] <= sh and v[2].shape[1] <= sw]
+        stack = np.zeros((len(usable),) + fft_shape, np.float32)
+        for k, i in enumerate(usable):
+            centered = self.variants[i][2]
+            stack[k, :centered.shape[0], :centered.shape[1]] = centered
+        # 상관 = IFFT(FFT(화면) * conj(FFT(템플릿)))
+        spectra = np.conj(np.fft.rfft2(stack))
+
+        if len(self.spectra) >= self.max_cached_shapes:
+            self.spectra.pop(next(iter(self.spectra)))
+        cached = self.spectra[shape] = (fft_shape, usable, spectra)
+        return cached
+
+    def correlate(self, screen_gray):
+        """템플릿 변형별 (변형 번호, {방법: 점수 맵}) 목록"""
+        return self.correlate_many([screen_gray])[0]
+
+    def correlate_many(self, screens, executor=None):
+        """같은 크기의 화면(영역) 여러 개를 모든 템플릿 변형과 상관 - 화면별 correlate() 결과 목록
+
+        화면 스펙트럼은 영역을 쌓아 한 번의 rfft2로 구하고, 캐시된 템플릿 스펙트럼과 곱한 뒤의
+        역변환과 정규화는 영역별로 합니다 (executor가 있으면 병렬). 역변환까지 한 번에 하면
+        (영역 x 변형) 크기의 중간 배열이 캐시를 벗어나 영역별 처리보다 오히려 느립니다.
+        """
+        stack = np.stack([screen.astype(np.float32) for screen in screens])
+        fft_shape, usable, spectra = self._spectra_for(stack.shape[1:3])
+        if not usable:
+            return [[] for _ in screens]
+
+        screen_spectra = np.fft.rfft2(stack, s=fft_shape)
+
+        def score(n):
+            correlations = np.fft.irfft2(screen_spectra[n][None] * spectra, s=fft_shape)
+            return self._score_maps(stack[n], correlations, usable)
+
+        indices = range(len(stack))
+        if executor is None or len(stack) < 2:
+            return [score(n) for n in indices]
+        return list(executor.map(score, indices))
+
+    def _score_maps(self, screen, correlations, usable):
+        """한 화면의 상관 결과를 정규화하여 변형별 점수 맵으로 변환"""
+        sh, sw = screen.shape
+        window_sum, window_sqsum = cv2.integral2(screen, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+
+        maps = []
+        for k, i in enumerate(usable):
+            _, _, centered, mean, centered_norm, raw_norm = self.variants[i]
+            th, tw = centered.shape
+            rh, rw = sh - th + 1, sw - tw + 1
+            numerator = correlations[k, :rh, :rw]
+            s1 = (window_sum[th:, tw:] - window_sum[:rh, tw:]
+                  - window_sum[th:, :rw] + window_sum[:rh, :rw])
+            s2 = (window_sqsum[th:, tw:] - window_sqsum[:rh, tw:]
+                  - window_sqsum[th:, :rw] + window_sqsum[:rh, :rw])
+
+            scores = {}
+            if cv2.TM_CCOEFF_NORMED in self.methods:
+                variance = np.maximum(s2 - s1 * s1 / (th * tw), 0.0)
+                scores[cv2.TM_CCOEFF_NORMED] = self._normalize(
+                    numerator, np.sqrt(variance) * centered_norm)
+            if cv2.TM_CCORR_NORMED in self.methods:
+                # 원본 템플릿과의 상관 = 평균 제거 상관 + 평균 * 창 합계
+                scores[cv2.TM_CCORR_NORMED] = self._normalize(
+                    numerator + mean * s1, np.sqrt(np.maximum(s2, 0.0)) * raw_norm)
+            maps.append((i, scores))
+        return maps
+
+    @staticmethod
+    def _normalize(numerator, denominator):
+        """분모가 0에 가까운(평탄한) 위치는 0점"""
+        valid = denominator > 1e-3
+        scores = np.zeros(numerator.shape, np.float32)
+        np.divide(numerator, denominator, out=scores, where=valid, casting='unsafe')
+        return scores
+
+    def match_all(self, screen_gray):
+        """템플릿별 최고 점수 결과 목록 (배율/방법 중 최고, 템플릿 번호 순)"""
+        return self._best(self.correlate(screen_gray))
+
+    def _best(self, maps):
+        best = [NO_MATCH] * self.template_count
+        for i, scores in maps:
+            index, scale = self.variants[i][:2]
+            for method, score_map in scores.items():
+                _, max_val, _, max_loc = cv2.minMaxLoc(score_map)
+                if max_val > best[index].score:
+                    best[index] = MatchResult(max_val, max_loc, index, scale, method)
+        return best
+
+    def match(self, screen_gray, threshold=None):
+        """가장 정확도가 높은 매칭 결과 반환"""
+        return max(self.match_all(screen_gray), key=lambda r: r.score, default=NO_MATCH)
+
+    def match_many(self, images, threshold=None, executor=None):
+        """여러 영역을 크기별로 묶어 화면 스펙트럼을 한 번에 구한 뒤 매칭 (영역별 최고 결과 목록)"""
+        groups = {}
+        for n, image in enumerate(images):
+            groups.setdefault(image.shape[:2], []).append(n)
+
+        results = [NO_MATCH] * len(images)
+        for indices in groups.values():
+            maps = self.correlate_many([images[n] for n in indices], executor)
+            for n, image_maps in zip(indices, maps):
+                results[n] = max(self._best(image_maps), key=lambda r: r.score, default=NO_MATCH)
+        return results
+
+MATCHERS = {
+    'pyramid': PyramidMatcher,
+    'fft': FftMatcher,
+}
+
+def create_matcher(name, templates, **kwargs):
+    """매칭 엔진 생성 - name이 없으면 환경변수 MATCHER ('fft', 'pyramid'), 기본값은 fft"""
+    name = name or os.environ.get('MATCHER', 'fft')
+    if name not in MATCHERS:
+        raise ValueError(f"알 수 없는 매칭 엔진: {name}")
+    return MATCHERS[name](templates, **kwargs)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless
+from input_backend import RecordingInput
+
+def create_fishing_bot(regions):
+    bot, _ = headless.create_bot('fishing', {'regions': regions})
+    bot.input = RecordingInput()
+    return bot
+
+def actions(bot):
+    return [(action, args) for _, action, args in bot.input.events]
+
+def test_key_press_clicks_configured_focus_point_first():
+    bot = create_fishing_bot([{'region': [0, 0, 400, 400], 'focus_point': [200, 10]},
+                              {'region': [420, 0, 400, 400], 'focus_point': [620, 10]}])
+    bot.press_key('e', bot.regions[1])
+    bot.press_key('e', bot.regions[0])
+    assert actions(bot) == [('click', (620, 10)), ('press', ('e',)),
+                            ('click', (200, 10)), ('press', ('e',))]
+
+def test_multiple_regions_default_to_region_center():
+    bot = create_fishing_bot([[0, 0, 400, 400], [420, 0, 400, 400]])
+    for state in bot.regions:
+        bot.step(state, now=0.0, view=None, watching=[])
+    assert actions(bot) == [('click', (200, 200)), ('press', ('e',)),
+                            ('click', (620, 200)), ('press', ('e',))]
+
+def test_single_region_presses_without_click():
+    bot = create_fishing_bot([[0, 0, 400, 400]])
+    bot.step(bot.regions[0], now=0.0, view=None, watching=[])
+    assert actions(bot) == [('press', ('e',))]
+
+def test_unknown_region_key_is_rejected():
+    with pytest.raises(ValueError):
+        create_fishing_bot([{'region': [0, 0, 400, 400], 'focus': [1, 2]}])
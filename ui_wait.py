@@ -0,0 +1,71 @@
+import time
+from frame_change import FrameChangeDetector
+
+def wait_until(condition, timeout, interval=0.05):
+    """condition()이 참인 값을 반환할 때까지 짧은 주기로 확인
+
+    참인 값을 반환하면 그 값을, timeout 안에 준비되지 않으면 None을 반환합니다.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        result = condition()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
+
+class ScreenWatcher:
+    """작은 화면 영역을 축소 캡처하여 변화/안정 여부로 UI 준비 상태를 판단"""
+
+    def __init__(self, capture, scale=0.25, pixel_threshold=16, min_changed_pixels=4):
+        self.capture = capture
+        self.detector = FrameChangeDetector(scale=scale, pixel_threshold=pixel_threshold,
+                                            min_changed_pixels=min_changed_pixels)
+
+    def snapshot(self, region):
+        """영역의 비교용 축소 이미지 (캡처 실패 시 None)"""
+        frame = self.capture.grab(region, gray=True)
+        if frame is None:
+            return None
+        return self.detector.signature(frame)
+
+    def wait_for_change(self, region, reference, timeout, interval=0.03):
+        """reference와 달라질 때까지 대기 (예: 모달이 뜨거나 사라짐)"""
+        if reference is None:
+            return False
+
+        def changed():
+            current = self.snapshot(region)
+            return current is not None and self.detector.differs(current, reference)
+
+        return wait_until(changed, timeout, interval) is not None
+
+    def wait_for_stable(self, region, timeout, frames=3, interval=0.05):
+        """연속 frames번 캡처가 같을 때까지 대기 (예: 목록 로딩/애니메이션 종료)"""
+        state = {'last': None, 'count': 0}
+
+        def stable():
+            current = self.snapshot(region)
+            if current is None:
+                return False
+            if state['last'] is not None and not self.detector.differs(current, state['last']):
+                state['count'] += 1
+            else:
+                state['count'] = 0
+            state['last'] = current
+            return state['count'] >= frames - 1
+
+        return wait_until(stable, timeout, interval) is not None
+
+    def wait_for_update(self, region, reference, timeout, change_timeout=None):
+        """화면이 바뀌기 시작한 뒤 안정될 때까지 대기 (전체 timeout 안에서)
+
+        change_timeout 안에 변화가 없으면 이미 반영된 것으로 보고 안정 여부만 확인합니다.
+        """
+        deadline = time.monotonic() + timeout
+        if change_timeout is None:
+            change_timeout = timeout / 2
+        self.wait_for_change(region, reference, change_timeout)
+        return self.wait_for_stable(region, max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,54 @@
+import cv2
+import numpy as np
+
+def find_window_candidates(gray, max_width=480, min_area_ratio=0.03,
+                           aspect_range=(1.2, 2.6), max_candidates=3):
+    """크게 축소한 화면에서 앱플레이어 창 후보 사각형을 찾습니다
+
+    세로로 긴(휴대폰 화면 비율) 큰 사각형 윤곽을 찾아 원본 좌표의
+    (left, top, right, bottom) 목록을 면적이 큰 순서로 반환합니다.
+    """
+    height, width = gray.shape[:2]
+    scale = min(1.0, max_width / width)
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    edges = cv2.Canny(small, 30, 90)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = min_area_ratio * small.shape[0] * small.shape[1]
+    candidates = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        area = w * h
+        if area < min_area:
+            continue
+        if not aspect_range[0] <= h / w <= aspect_range[1]:
+            continue
+        # 윤곽이 사각형을 거의 채워야 창 테두리로 봄
+        if cv2.contourArea(contour) < 0.8 * area:
+            continue
+        candidates.append((area, (x, y, x + w, y + h)))
+
+    candidates.sort(key=lambda c: c[0], reverse=True)
+
+    regions = []
+    for _, (x0, y0, x1, y1) in candidates:
+        region = (int(x0 / scale), int(y0 / scale),
+                  min(width, int(np.ceil(x1 / scale))), min(height, int(np.ceil(y1 / scale))))
+        # 같은 창의 안쪽/바깥쪽 윤곽이 겹쳐 나오는 경우 제외
+        if any(_overlap(region, other) > 0.8 for other in regions):
+            continue
+        regions.append(region)
+        if len(regions) >= max_candidates:
+            break
+    return regions
+
+def _overlap(a, b):
+    """두 사각형의 겹친 면적 / 작은 사각형 면적"""
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    if w <= 0 or h <= 0:
+        return 0.0
+    smaller = min((a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1]))
+    return (w * h) / smaller